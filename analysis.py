@@ -0,0 +1,98 @@
+# analysis.py
+# ---------------------------------------------------------------------
+# Análisis en segundo plano para game.py: el bucle principal no hace
+# cálculos largos, los encarga a un hilo y recibe el resultado como un
+# evento de pygame (ANALYSIS_EVENT). Tareas:
+#   - "end":    fin de partida (game_end_message) del bando que mueve; de
+#               paso deja armado el mapa de jugadas legales de la posición
+#               (rules.legal_move_map) que usan los clics de selección
+#   - "engine": mejor jugada del motor (engine/search.py)
+#
+# Cada cambio de posición abre una nueva generación: lo pendiente se
+# descarta, la búsqueda en curso se corta con el stop del Searcher y los
+# eventos de generaciones viejas se ignoran (event.generation).
+# ---------------------------------------------------------------------
+
+import queue
+import threading
+from typing import Optional
+
+import pygame
+
+from board.board import Board
+from board.coordenates import Coordenate
+from engine.search import best_move
+from rules import game_end_message
+
+ANALYSIS_EVENT = pygame.USEREVENT + 1
+
+
+class AnalysisService:
+    def __init__(self, engine_time: float):
+        self.engine_time = engine_time
+        self.generation = 0
+        self._jobs: "queue.Queue" = queue.Queue()
+        self._stop = threading.Event()
+        self._lock = threading.Lock()
+        self._thread = threading.Thread(target=self._run, name="analysis", daemon=True)
+        self._thread.start()
+
+    # ------------------------------ hilo principal ------------------------------
+
+    def position_changed(self, board: Board, turn: str, ep_target: Optional[Coordenate],
+                         engine_color: Optional[str]) -> None:
+        """Cancela lo pendiente y encarga el análisis de la posición nueva."""
+        self.cancel()
+        # El hilo trabaja sobre una copia: make/unmake no tocan el tablero dibujado
+        job = (self.generation, board.copy(), turn, ep_target)
+        self._jobs.put(("end",) + job)
+        if turn == engine_color:
+            self._jobs.put(("engine",) + job)
+
+    def cancel(self) -> None:
+        """Nueva generación: corta la búsqueda en curso y vacía la cola."""
+        with self._lock:
+            self.generation += 1
+            self._stop.set()
+            self._stop = threading.Event()
+        try:
+            while True:
+                self._jobs.get_nowait()
+        except queue.Empty:
+            pass
+
+    def is_current(self, event) -> bool:
+        return event.generation == self.generation
+
+    def close(self) -> None:
+        self.cancel()
+        self._jobs.put(None)
+
+    # ------------------------------ hilo de análisis -----------------------------
+
+    def _run(self) -> None:
+        while True:
+            job = self._jobs.get()
+            if job is None:
+                return
+            kind, generation, board, turn, ep_target = job
+            with self._lock:
+                if generation != self.generation:
+                    continue
+                stop = self._stop
+            try:
+                result = self._compute(kind, board, turn, ep_target, stop)
+            except Exception as e:
+                print(f"[ERROR] Análisis '{kind}' falló: {e}")
+                continue
+            if generation == self.generation and not stop.is_set():
+                pygame.event.post(pygame.event.Event(
+                    ANALYSIS_EVENT, kind=kind, generation=generation, result=result))
+
+    def _compute(self, kind: str, board: Board, turn: str, ep_target, stop: threading.Event):
+        if kind == "end":
+            return game_end_message(board, turn, ep_target)
+        if kind == "engine":
+            return best_move(board, turn, ep_target, time_limit=self.engine_time, stop=stop)
+        raise ValueError(f"Tarea desconocida: {kind}")
+
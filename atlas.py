@@ -0,0 +1,182 @@
+# atlas.py
+# ---------------------------------------------------------------------
+# Atlas de sprites para game.py: las 12 piezas y los iconos de la barra
+# lateral se empaquetan en una sola textura ya escalada al TILE_SIZE y se
+# guarda en disco (sprites/.cache/). Los arranques siguientes cargan un
+# único PNG en lugar de decodificar y escalar cada archivo.
+#
+# Los fondos (board.png, background.png) no entran en el atlas por
+# tamaño, pero su versión escalada también se cachea en disco.
+#
+# La caché se invalida sola: el nombre del archivo lleva un hash de los
+# PNG de origen (nombre, tamaño, fecha) y de los tamaños pedidos.
+# ---------------------------------------------------------------------
+
+import hashlib
+import os
+from typing import Dict, Iterable, Optional, Tuple
+
+import pygame
+
+from board.bitboard import PIECE_NAMES, COLORS
+
+SPRITES_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "sprites")
+CACHE_DIR = os.path.join(SPRITES_DIR, ".cache")
+
+NAME_TO_SPRITEBASE = {
+    "pawn":   "pawn",
+    "rook":   "rook",
+    "bishop": "bishop",
+    "queen":  "queen",
+    "king":   "king",
+    "knight": "knight"
+}
+
+ICON_NAMES = ("save.png", "close.png", "back.png", "tablas.png", "flag.png")
+ICON_SIZE = 40
+
+# Subir si cambia la disposición del atlas (invalida las cachés viejas)
+ATLAS_VERSION = 1
+
+
+def _signature(paths: Iterable[str], *extra) -> str:
+    h = hashlib.sha1(repr((ATLAS_VERSION,) + extra).encode())
+    for path in paths:
+        try:
+            st = os.stat(path)
+            h.update(f"{os.path.basename(path)}:{st.st_size}:{st.st_mtime_ns};".encode())
+        except OSError:
+            h.update(f"{os.path.basename(path)}:-;".encode())
+    return h.hexdigest()[:12]
+
+
+def _save_cache(surface: pygame.Surface, path: str) -> None:
+    try:
+        os.makedirs(CACHE_DIR, exist_ok=True)
+        pygame.image.save(surface, path)
+    except (OSError, pygame.error) as e:
+        print(f"[INFO] No se pudo guardar la caché {path}: {e}")
+
+
+def _piece_path(name: str, color: str) -> str:
+    return os.path.join(SPRITES_DIR, f"{NAME_TO_SPRITEBASE[name]}_{color}.png")
+
+
+class SpriteAtlas:
+    """
+    Piezas (fila 0 blancas, fila 1 negras, en el orden de PIECE_NAMES) e
+    iconos (fila 2) en una sola superficie. No carga nada hasta el primer
+    get()/icon(); cada sprite es una subsuperficie del atlas.
+    """
+
+    def __init__(self, tile_size: int, icon_size: int = ICON_SIZE):
+        self.tile_size = tile_size
+        self.icon_size = icon_size
+        self.surface: Optional[pygame.Surface] = None
+        self._pieces: Dict[Tuple[str, str], pygame.Surface] = {}
+        self._icons: Dict[str, Optional[pygame.Surface]] = {}
+
+    # --- acceso ---
+    def get(self, key: Tuple[str, str], default=None):
+        """Sprite de (nombre, color), con la misma interfaz que el dict anterior."""
+        self._load()
+        return self._pieces.get(key, default)
+
+    def icon(self, name: str) -> Optional[pygame.Surface]:
+        self._load()
+        return self._icons.get(name)
+
+    # --- carga ---
+    def _sources(self):
+        pieces = [_piece_path(n, c) for c in COLORS for n in PIECE_NAMES]
+        icons = [os.path.join(SPRITES_DIR, n) for n in ICON_NAMES]
+        return pieces, icons
+
+    def _size(self) -> Tuple[int, int]:
+        t, i = self.tile_size, self.icon_size
+        return max(6 * t, len(ICON_NAMES) * i), 2 * t + i
+
+    def _load(self) -> None:
+        if self.surface is not None:
+            return
+        pieces, icons = self._sources()
+        sig = _signature(pieces + icons, self.tile_size, self.icon_size)
+        path = os.path.join(CACHE_DIR, f"atlas_{self.tile_size}_{self.icon_size}_{sig}.png")
+
+        surface = None
+        if os.path.isfile(path):
+            try:
+                surface = pygame.image.load(path).convert_alpha()
+            except pygame.error:
+                surface = None
+        if surface is None or surface.get_size() != self._size():
+            surface = self._build(pieces, icons)
+            _save_cache(surface, path)
+        self.surface = surface
+        self._slice(icons)
+
+    def _build(self, pieces, icons) -> pygame.Surface:
+        t, i = self.tile_size, self.icon_size
+        atlas = pygame.Surface(self._size(), pygame.SRCALPHA)
+        for k, path in enumerate(pieces):
+            x, y = (k % 6) * t, (k // 6) * t
+            try:
+                img = pygame.image.load(path).convert_alpha()
+                atlas.blit(pygame.transform.smoothscale(img, (t, t)), (x, y))
+            except Exception as e:
+                print(f"[WARN] No se pudo cargar sprite {os.path.basename(path)}: {e}")
+                pygame.draw.circle(atlas, (220, 50, 50), (x + t // 2, y + t // 2), t // 3)
+        for k, path in enumerate(icons):
+            if not os.path.isfile(path):
+                continue
+            try:
+                img = pygame.image.load(path).convert_alpha()
+                atlas.blit(pygame.transform.smoothscale(img, (i, i)), (k * i, 2 * t))
+            except Exception as e:
+                print(f"[WARN] No se pudo cargar icono {os.path.basename(path)}: {e}")
+        return atlas
+
+    def _slice(self, icons) -> None:
+        t, i = self.tile_size, self.icon_size
+        for k, color in enumerate(COLORS):
+            for j, name in enumerate(PIECE_NAMES):
+                self._pieces[(name, color)] = self.surface.subsurface((j * t, k * t, t, t))
+        for k, path in enumerate(icons):
+            # un icono que falta sigue siendo None (la barra dibuja el texto)
+            found = os.path.isfile(path)
+            self._icons[ICON_NAMES[k]] = (
+                self.surface.subsurface((k * i, 2 * t, i, i)) if found else None
+            )
+
+
+# Un atlas por tamaño de casilla: cambiar el tamaño del tablero en
+# ejecución reutiliza el ya cargado (o su caché en disco).
+_atlases: Dict[Tuple[int, int], SpriteAtlas] = {}
+
+
+def atlas_for(tile_size: int, icon_size: int = ICON_SIZE) -> SpriteAtlas:
+    key = (tile_size, icon_size)
+    if key not in _atlases:
+        _atlases[key] = SpriteAtlas(tile_size, icon_size)
+    return _atlases[key]
+
+
+def load_scaled(path: str, size: Tuple[int, int], alpha: bool = True) -> Optional[pygame.Surface]:
+    """Imagen escalada a 'size', desde la caché en disco si ya existe. None si falta."""
+    if not os.path.isfile(path):
+        return None
+    sig = _signature([path], size, alpha)
+    base = os.path.splitext(os.path.basename(path))[0]
+    cached = os.path.join(CACHE_DIR, f"{base}_{size[0]}x{size[1]}_{sig}.png")
+    if os.path.isfile(cached):
+        try:
+            img = pygame.image.load(cached)
+            return img.convert_alpha() if alpha else img.convert()
+        except pygame.error:
+            pass
+    img = pygame.image.load(path)
+    img = img.convert_alpha() if alpha else img.convert()
+    if img.get_size() != tuple(size):
+        img = pygame.transform.smoothscale(img, size)
+        _save_cache(img, cached)
+    return img
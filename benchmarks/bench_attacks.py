@@ -0,0 +1,141 @@
+# bench_attacks.py
+# ---------------------------------------------------------------------
+# Mide el chequeo "¿está atacada esta casilla?" sobre las 64 casillas y
+# ambos colores: el barrido anterior casilla por casilla con Coordenate
+# frente a las tablas precalculadas (board/attacks.py), tanto por
+# Board.is_square_attacked como directo sobre BitboardPosition.
+#
+# No pasa por has_any_legal_move: desde que usa la generación por
+# bitboards y la caché de rules.legal_move_map ya no llama a
+# is_square_attacked, y repetirla solo mediría aciertos de la caché.
+#
+# Uso (desde la raíz del repo):
+#   python -m benchmarks.bench_attacks [repeticiones]
+# ---------------------------------------------------------------------
+
+import sys
+import time
+
+from board.board import Board, FILES
+from board.coordenates import Coordenate, from_square
+from rules import apply_simple_move, alg_to_coord
+
+# Posiciones de prueba: partidas cortas en UCI aplicadas sobre el inicio
+LINES = {
+    "inicial": [],
+    "italiana": ["e2e4", "e7e5", "g1f3", "b8c6", "f1c4", "f8c5", "c2c3", "g8f6", "d2d4", "e5d4"],
+    "medio juego": ["d2d4", "d7d5", "c2c4", "e7e6", "b1c3", "g8f6", "c1g5", "f8e7", "e2e3", "e8g8",
+                    "g1f3", "b8d7", "a1c1", "c7c6", "f1d3", "d5c4", "d3c4", "f6d5"],
+    "damas activas": ["e2e4", "e7e5", "d1h5", "b8c6", "f1c4", "d8f6", "h5f3", "f6g6", "f3g3", "g6g3"],
+    "mate del loco": ["f2f3", "e7e5", "g2g4", "d8h4"],
+}
+
+
+def legacy_is_square_attacked(self, coord: Coordenate, by_color: str) -> bool:
+    """Versión original: recorre casillas creando Coordenate en cada paso."""
+    def piece(c):
+        p = self.get_piece_at(c)
+        if not p:
+            return None, None
+        return p.name, p.color
+
+    for df in (-1, 1):
+        r = coord.row + (-1 if by_color == "white" else 1)
+        f = chr(ord(coord.col) + df)
+        if f in FILES and 1 <= r <= 8:
+            c = Coordenate(r, f)
+            if piece(c) == ("pawn", by_color):
+                return True
+    for df, dr in [(1, 2), (2, 1), (2, -1), (1, -2), (-1, -2), (-2, -1), (-2, 1), (-1, 2)]:
+        r = coord.row + dr
+        f = chr(ord(coord.col) + df)
+        if f in FILES and 1 <= r <= 8:
+            c = Coordenate(r, f)
+            if piece(c) == ("knight", by_color):
+                return True
+    for dirs, sliding in (([(1, 1), (1, -1), (-1, 1), (-1, -1)], ("bishop", "queen")),
+                          ([(1, 0), (-1, 0), (0, 1), (0, -1)], ("rook", "queen"))):
+        for df, dr in dirs:
+            f_i = ord(coord.col) - ord('a')
+            r_i = coord.row - 1
+            while True:
+                f_i += df
+                r_i += dr
+                if not (0 <= f_i < 8 and 0 <= r_i < 8):
+                    break
+                c = Coordenate(r_i + 1, chr(ord('a') + f_i))
+                name, color = piece(c)
+                if name:
+                    if color == by_color and name in sliding:
+                        return True
+                    break
+    for df in (-1, 0, 1):
+        for dr in (-1, 0, 1):
+            if df == 0 and dr == 0:
+                continue
+            r = coord.row + dr
+            f = chr(ord(coord.col) + df)
+            if f in FILES and 1 <= r <= 8:
+                c = Coordenate(r, f)
+                if piece(c) == ("king", by_color):
+                    return True
+    return False
+
+
+def build_positions():
+    positions = []
+    for name, moves in LINES.items():
+        board = Board()
+        ep = None
+        for mv in moves:
+            ep = apply_simple_move(board, alg_to_coord(mv[:2]), alg_to_coord(mv[2:4]), ep)
+        turn = "white" if len(moves) % 2 == 0 else "black"
+        positions.append((name, board, turn, ep))
+    return positions
+
+
+SQUARES = [(sq, from_square(sq)) for sq in range(64)]
+COLORS = ("white", "black")
+
+
+def time_it(check, positions, reps: int) -> float:
+    """check(board, sq, coord, color) en todas las casillas, para ambos colores."""
+    t0 = time.perf_counter()
+    for _ in range(reps):
+        for _, board, _, _ in positions:
+            for sq, coord in SQUARES:
+                for color in COLORS:
+                    check(board, sq, coord, color)
+    return time.perf_counter() - t0
+
+
+ARMS = {
+    "barrido Coordenate": lambda board, sq, coord, color: legacy_is_square_attacked(board, coord, color),
+    "Board (tablas)": lambda board, sq, coord, color: board.is_square_attacked(coord, color),
+    "BitboardPosition": lambda board, sq, coord, color: board.bb.is_square_attacked(sq, color),
+}
+
+
+def main():
+    reps = int(sys.argv[1]) if len(sys.argv) > 1 else 20
+    positions = build_positions()
+
+    # Las tres versiones tienen que dar lo mismo antes de compararlas
+    for name, board, _, _ in positions:
+        for sq, coord in SQUARES:
+            for color in COLORS:
+                results = {check(board, sq, coord, color) for check in ARMS.values()}
+                if len(results) != 1:
+                    raise SystemExit(f"[ERROR] {name}: {coord} atacada por {color} no coincide")
+
+    times = {label: time_it(check, positions, reps) for label, check in ARMS.items()}
+    legacy = times["barrido Coordenate"]
+
+    calls = reps * len(positions) * len(SQUARES) * len(COLORS)
+    print(f"is_square_attacked x{calls} ({len(positions)} posiciones, 64 casillas, 2 colores)")
+    for label, t in times.items():
+        print(f"  {label:<18} : {t * 1000:9.1f} ms  ({t / calls * 1e6:6.2f} us/llamada)  {legacy / t:6.2f}x")
+
+
+if __name__ == "__main__":
+    main()
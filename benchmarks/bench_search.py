@@ -0,0 +1,49 @@
+# bench_search.py
+# ---------------------------------------------------------------------
+# Nodos y tiempo de engine/search.py hasta una profundidad fija en las
+# posiciones de benchmarks/perft.py. Cada búsqueda empieza con la tabla
+# de transposición vacía, así los números se pueden comparar entre
+# versiones (menos nodos = mejor poda).
+#
+# Uso (desde la raíz del repo):
+#   python -m benchmarks.bench_search [profundidad] [--only nombre]
+# ---------------------------------------------------------------------
+
+import argparse
+import sys
+import time
+
+from board.bitboard import BitboardPosition
+from board.movegen import move_to_uci
+from benchmarks.perft import POSITIONS
+from engine.search import Searcher, TT_SIZE_MB
+from engine.transposition import TranspositionTable
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Nodos de la búsqueda a profundidad fija")
+    parser.add_argument("depth", nargs="?", type=int, default=4)
+    parser.add_argument("--only", action="append", default=[], metavar="NOMBRE")
+    args = parser.parse_args()
+
+    print(f"{'posición':<10} {'prof':>4} {'nodos':>10} {'tiempo':>8} {'nodos/s':>10}  jugada  eval")
+    total_nodes, total_time = 0, 0.0
+    for name, fen, _ in POSITIONS:
+        if args.only and name not in args.only:
+            continue
+        searcher = Searcher(max_depth=args.depth, tt=TranspositionTable(TT_SIZE_MB))
+        t0 = time.perf_counter()
+        move = searcher.search(BitboardPosition.from_fen(fen))
+        dt = time.perf_counter() - t0
+        total_nodes += searcher.nodes
+        total_time += dt
+        print(f"{name:<10} {args.depth:>4} {searcher.nodes:>10} {dt:>7.2f}s "
+              f"{searcher.nodes / dt if dt else 0:>10.0f}  {move_to_uci(move) if move else '-':<6} "
+              f"{searcher.best_score:>5}")
+    if total_time:
+        print(f"total: {total_nodes} nodos en {total_time:.2f}s")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,212 @@
+# perft.py
+# ---------------------------------------------------------------------
+# Perft: cuenta las hojas del árbol de jugadas legales hasta la
+# profundidad N y las compara con los valores conocidos. Es la prueba de
+# regresión del generador: cualquier cambio de rendimiento tiene que
+# mantener los conteos exactos (y acá se ve cuánto mejoró).
+#
+# Dos capas:
+#   - movegen: generate_legal_moves + make/unmake de BitboardPosition
+#   - game:    generate_moves/legal_moves/apply_simple_move (rules.py, las
+#              que usa game.py) y Board.find_sources (más lento, por eso
+#              menos profundidad)
+# game.py solo promociona a dama, así que esa capa se compara con el
+# perft de movegen sin subpromociones. Al final corren unas regresiones
+# puntuales (posiciones que alguna vez quedaron corruptas).
+#
+# Uso (desde la raíz del repo):
+#   python -m benchmarks.perft [profundidad] [--game N] [--only nombre]
+#   python -m benchmarks.perft --divide "FEN" profundidad
+# Sale con código 1 si algún conteo no coincide.
+# ---------------------------------------------------------------------
+
+import argparse
+import sys
+import time
+from typing import Dict, List, Optional
+
+from board.bitboard import BitboardPosition, PIECE_NAMES, PAWN, KING, START_FEN, square_index
+from board.board import Board, FILES
+from board.coordenates import Coordenate
+from board.movegen import generate_legal_moves, move_to_uci
+from board.movementsRecorder import MovementsChecker
+from pieces.flyweight import PIECES
+from rules import legal_moves, apply_simple_move, undo_last_move
+
+# Posiciones estándar (chessprogramming.org/Perft_Results): nombre, FEN, {profundidad: hojas}
+POSITIONS = [
+    ("inicial", START_FEN,
+     {1: 20, 2: 400, 3: 8902, 4: 197281, 5: 4865609}),
+    # Enroques por ambos lados, clavadas, en passant y promociones
+    ("kiwipete", "r3k2r/p1ppqpb1/bn2pnp1/3PN3/1p2P3/2N2Q1p/PPPBBPPP/R3K2R w KQkq - 0 1",
+     {1: 48, 2: 2039, 3: 97862, 4: 4085603}),
+    # Final de torres: en passant que deja al rey en jaque por la fila
+    ("pos3", "8/2p5/3p4/KP5r/1R3p1k/8/4P1P1/8 w - - 0 1",
+     {1: 14, 2: 191, 3: 2812, 4: 43238, 5: 674624}),
+    # Promociones con captura y enroques con el rey atacado
+    ("pos4", "r3k2r/Pppp1ppp/1b3nbN/nP6/BBP1P3/q4N2/Pp1P2PP/R2Q1RK1 w kq - 0 1",
+     {1: 6, 2: 264, 3: 9467, 4: 422333}),
+    ("pos5", "rnbq1k1r/pp1Pbppp/2p5/8/2B5/8/PPP1NnPP/RNBQK2R w KQ - 1 8",
+     {1: 44, 2: 1486, 3: 62379, 4: 2103487}),
+    ("pos6", "r4rk1/1pp1qppp/p1np1n2/2b1p1B1/2B1P1b1/P1NP1N2/1PP1QPPP/R4RK1 w - - 0 10",
+     {1: 46, 2: 2079, 3: 89890, 4: 3894594}),
+]
+
+
+# ------------------------------- movegen -----------------------------------
+
+def perft(position: BitboardPosition, depth: int, underpromotions: bool = True) -> int:
+    """Hojas a 'depth' medias jugadas, con make/unmake sobre la posición."""
+    moves = generate_legal_moves(position, position.turn)
+    if not underpromotions:
+        moves = [m for m in moves if m >> 12 in (0, 4)]
+    if depth == 1:
+        return len(moves)
+    nodes = 0
+    for move in moves:
+        position.make_move(move)
+        nodes += perft(position, depth - 1, underpromotions)
+        position.unmake_move()
+    return nodes
+
+
+def divide(position: BitboardPosition, depth: int) -> Dict[str, int]:
+    """Hojas por jugada de la raíz (para encontrar la jugada que difiere)."""
+    res = {}
+    for move in generate_legal_moves(position, position.turn):
+        position.make_move(move)
+        res[move_to_uci(move)] = perft(position, depth - 1) if depth > 1 else 1
+        position.unmake_move()
+    return res
+
+
+# -------------------------------- game.py ----------------------------------
+
+def perft_game(board: Board, turn: str, ep_target: Optional[Coordenate], depth: int) -> int:
+    """
+    Perft con las funciones de rules.py. En cada nodo verifica además que
+    Board.find_sources encuentre el origen de cada jugada normal.
+    """
+    enemy = "black" if turn == "white" else "white"
+    nodes = 0
+    for r in range(8):
+        for c in range(8):
+            piece = board.board[r][c]
+            if piece is None or piece.color != turn:
+                continue
+            src = Coordenate(r + 1, FILES[c])
+            for dst in legal_moves(board, src, turn, ep_target):
+                _check_sources(board, src, dst, turn, ep_target)
+                if depth == 1:
+                    nodes += 1
+                    continue
+                ep = apply_simple_move(board, src, dst, ep_target)
+                nodes += perft_game(board, enemy, ep, depth - 1)
+                undo_last_move(board)
+    return nodes
+
+
+def _check_sources(board: Board, src: Coordenate, dst: Coordenate, turn: str, ep_target) -> None:
+    s = square_index(src.col, src.row)
+    d = square_index(dst.col, dst.row)
+    kind = board.bb.mailbox[s] % 6
+    if kind == KING and abs(d - s) == 2:
+        return  # el enroque no pasa por find_sources
+    if kind == PAWN and ep_target is not None and (dst.col, dst.row) == (ep_target.col, ep_target.row):
+        return  # ni la captura al paso
+    hint = {"origin_file": src.col} if kind == PAWN else {}
+    found = board.find_sources(PIECE_NAMES[kind], turn, dst, hint)
+    if not any((f.col, f.row) == (src.col, src.row) for f in found):
+        raise AssertionError(f"find_sources no encuentra {src.col}{src.row}->{dst.col}{dst.row}")
+
+
+# ------------------------------ regresiones --------------------------------
+
+def check_king_trial() -> bool:
+    # Kf1-h1 sin validar (torre ya en g1) se tomaba como enroque: el peón
+    # de a2 caía sobre la torre y la posición de MovementsChecker se perdía
+    checker = MovementsChecker()
+    checker.history = "e4,e5,Nf3,Nc6,Bc4,Bc5,Rg1,d6,Kf1,Nf6"
+    before = checker._position.to_fen()
+    checker.is_valid_move(Coordenate(1, "f"), "king", PIECES[KING], Coordenate(1, "h"))
+    good = checker._position.to_fen() == before
+    print(f"MovementsChecker Kf1-h1 {'ok' if good else '<-- ERROR: posición modificada'}")
+    return good
+
+
+# --------------------------------- CLI -------------------------------------
+
+def run_movegen(names: List[str], max_depth: int) -> bool:
+    ok = True
+    total_nodes, total_time = 0, 0.0
+    print(f"{'posición':<10} {'prof':>4} {'hojas':>10} {'esperado':>10} {'tiempo':>8} {'nodos/s':>10}")
+    for name, fen, expected in POSITIONS:
+        if names and name not in names:
+            continue
+        for depth in sorted(expected):
+            if depth > max_depth:
+                break
+            pos = BitboardPosition.from_fen(fen)
+            t0 = time.perf_counter()
+            nodes = perft(pos, depth)
+            dt = time.perf_counter() - t0
+            total_nodes += nodes
+            total_time += dt
+            good = nodes == expected[depth]
+            ok &= good
+            print(f"{name:<10} {depth:>4} {nodes:>10} {expected[depth]:>10} {dt:>7.2f}s "
+                  f"{nodes / dt if dt else 0:>10.0f}{'' if good else '  <-- ERROR'}")
+    if total_time:
+        print(f"total: {total_nodes} hojas en {total_time:.2f}s ({total_nodes / total_time:.0f} nodos/s)")
+    return ok
+
+
+def run_game(names: List[str], max_depth: int) -> bool:
+    ok = True
+    print(f"\ngame.py (solo promoción a dama) hasta profundidad {max_depth}")
+    for name, fen, _ in POSITIONS:
+        if names and name not in names:
+            continue
+        for depth in range(1, max_depth + 1):
+            expected = perft(BitboardPosition.from_fen(fen), depth, underpromotions=False)
+            board = Board.from_fen(fen)
+            t0 = time.perf_counter()
+            nodes = perft_game(board, board.bb.turn, board.ep_target(), depth)
+            dt = time.perf_counter() - t0
+            good = nodes == expected and board.bb.to_fen().split()[:4] == fen.split()[:4]
+            ok &= good
+            print(f"{name:<10} {depth:>4} {nodes:>10} {expected:>10} {dt:>7.2f}s "
+                  f"{nodes / dt if dt else 0:>10.0f}{'' if good else '  <-- ERROR'}")
+    return ok
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Perft del generador de jugadas")
+    parser.add_argument("depth", nargs="?", type=int, default=4,
+                        help="profundidad máxima para movegen (por defecto 4)")
+    parser.add_argument("--game", type=int, default=0, metavar="N",
+                        help="verificar también game.py hasta profundidad N")
+    parser.add_argument("--only", action="append", default=[], metavar="NOMBRE",
+                        help="limitar a una posición (se puede repetir)")
+    parser.add_argument("--divide", metavar="FEN",
+                        help="mostrar hojas por jugada de la raíz para un FEN")
+    args = parser.parse_args()
+
+    if args.divide:
+        pos = BitboardPosition.from_fen(args.divide)
+        res = divide(pos, args.depth)
+        for uci in sorted(res):
+            print(f"{uci}: {res[uci]}")
+        print(f"total: {sum(res.values())}")
+        return 0
+
+    ok = run_movegen(args.only, args.depth)
+    if args.game:
+        ok &= run_game(args.only, args.game)
+    ok &= check_king_trial()
+    print("OK" if ok else "FALLÓ")
+    return 0 if ok else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
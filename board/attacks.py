@@ -0,0 +1,208 @@
+from typing import List, Optional
+
+# ---------------------------------------------------------------------
+# Tablas de ataque precalculadas (se construyen una sola vez al importar).
+#
+#   KNIGHT_ATTACKS[sq], KING_ATTACKS[sq]  -> máscara de casillas atacadas
+#   PAWN_ATTACKS[color][sq]               -> idem para un peón de ese color
+#   RAYS[dir][sq]                         -> rayo completo desde sq (sin sq)
+#   BETWEEN[a][b]                         -> casillas entre a y b (alineadas)
+#
+# Los deslizantes se resuelven con rayos: se busca el primer bloqueador
+# del rayo (bit más bajo o más alto según el sentido) y se le resta el
+# rayo que sigue detrás de él. Son un puñado de operaciones por dirección.
+#
+# Casillas 0..63 con a1 = 0 (mismo esquema que board/bitboard.py).
+# ---------------------------------------------------------------------
+
+WHITE, BLACK = 0, 1
+
+FULL = 0xFFFF_FFFF_FFFF_FFFF
+FILE_A = 0x0101_0101_0101_0101
+FILE_H = FILE_A << 7
+NOT_A = FULL ^ FILE_A
+NOT_H = FULL ^ FILE_H
+NOT_AB = NOT_A & (NOT_A << 1)
+NOT_GH = NOT_H & (NOT_H >> 1)
+
+# Direcciones como desplazamiento de índice y máscara anti-"vuelta" de columna
+NORTH, SOUTH, EAST, WEST = 8, -8, 1, -1
+NORTH_EAST, NORTH_WEST, SOUTH_EAST, SOUTH_WEST = 9, 7, -7, -9
+
+_WRAP_MASK = {
+    NORTH: FULL, SOUTH: FULL,
+    EAST: NOT_A, WEST: NOT_H,
+    NORTH_EAST: NOT_A, NORTH_WEST: NOT_H,
+    SOUTH_EAST: NOT_A, SOUTH_WEST: NOT_H,
+}
+
+DIAGONAL_DIRS = (NORTH_EAST, NORTH_WEST, SOUTH_EAST, SOUTH_WEST)
+ORTHOGONAL_DIRS = (NORTH, SOUTH, EAST, WEST)
+ALL_DIRS = DIAGONAL_DIRS + ORTHOGONAL_DIRS
+
+
+# --------------------------- Operaciones de máscara ------------------------
+
+def shift(bb: int, direction: int) -> int:
+    if direction > 0:
+        bb = (bb << direction) & FULL
+    else:
+        bb >>= -direction
+    return bb & _WRAP_MASK[direction]
+
+
+def pawn_attacks_mask(bb: int, color: int) -> int:
+    if color == WHITE:
+        return shift(bb, NORTH_EAST) | shift(bb, NORTH_WEST)
+    return shift(bb, SOUTH_EAST) | shift(bb, SOUTH_WEST)
+
+
+def knight_attacks_mask(bb: int) -> int:
+    return (
+        ((bb << 17) & NOT_A) | ((bb << 15) & NOT_H) |
+        ((bb << 10) & NOT_AB) | ((bb << 6) & NOT_GH) |
+        ((bb >> 17) & NOT_H) | ((bb >> 15) & NOT_A) |
+        ((bb >> 10) & NOT_GH) | ((bb >> 6) & NOT_AB)
+    ) & FULL
+
+
+def king_attacks_mask(bb: int) -> int:
+    row = bb | shift(bb, EAST) | shift(bb, WEST)
+    return (row | shift(row, NORTH) | shift(row, SOUTH)) & ~bb & FULL
+
+
+def slide_mask(bb: int, directions, occupied: int) -> int:
+    """Ataques deslizantes desde 'bb', frenando en la primera pieza de cada rayo."""
+    empty = ~occupied & FULL
+    attacks = 0
+    for d in directions:
+        ray = shift(bb, d)
+        while ray:
+            attacks |= ray
+            ray = shift(ray & empty, d)
+    return attacks
+
+
+# ------------------------------- Tablas ------------------------------------
+
+KNIGHT_ATTACKS: List[int] = [knight_attacks_mask(1 << sq) for sq in range(64)]
+KING_ATTACKS: List[int] = [king_attacks_mask(1 << sq) for sq in range(64)]
+PAWN_ATTACKS: List[List[int]] = [
+    [pawn_attacks_mask(1 << sq, color) for sq in range(64)]
+    for color in (WHITE, BLACK)
+]
+RAYS = {d: [slide_mask(1 << sq, (d,), 0) for sq in range(64)] for d in ALL_DIRS}
+
+
+def _between_table() -> List[List[int]]:
+    # BETWEEN[a][b]: casillas estrictamente entre a y b si están alineadas (0 si no)
+    table = [[0] * 64 for _ in range(64)]
+    for a in range(64):
+        for d in ALL_DIRS:
+            ray = RAYS[d][a]
+            bb = ray
+            while bb:
+                b = (bb & -bb).bit_length() - 1
+                bb &= bb - 1
+                table[a][b] = ray & ~RAYS[d][b] & ~(1 << b)
+    return table
+
+
+BETWEEN: List[List[int]] = _between_table()
+
+_N, _S, _E, _W = RAYS[NORTH], RAYS[SOUTH], RAYS[EAST], RAYS[WEST]
+_NE, _NW, _SE, _SW = RAYS[NORTH_EAST], RAYS[NORTH_WEST], RAYS[SOUTH_EAST], RAYS[SOUTH_WEST]
+
+
+# ------------------------- Consultas de deslizantes ------------------------
+
+def _up(rays: List[int], sq: int, occupied: int) -> int:
+    # Rayo hacia índices mayores: el primer bloqueador es el bit más bajo
+    ray = rays[sq]
+    blockers = ray & occupied
+    if blockers:
+        return ray ^ rays[(blockers & -blockers).bit_length() - 1]
+    return ray
+
+
+def _down(rays: List[int], sq: int, occupied: int) -> int:
+    # Rayo hacia índices menores: el primer bloqueador es el bit más alto
+    ray = rays[sq]
+    blockers = ray & occupied
+    if blockers:
+        return ray ^ rays[blockers.bit_length() - 1]
+    return ray
+
+
+def ray_attacks(direction: int, sq: int, occupied: int) -> int:
+    """Rayo desde sq en 'direction' hasta el primer bloqueador (incluido)."""
+    if direction > 0:
+        return _up(RAYS[direction], sq, occupied)
+    return _down(RAYS[direction], sq, occupied)
+
+
+def first_blocker(direction: int, sq: int, occupied: int) -> Optional[int]:
+    """Primera casilla ocupada desde sq en 'direction' (None si el rayo está libre)."""
+    blockers = RAYS[direction][sq] & occupied
+    if not blockers:
+        return None
+    if direction > 0:
+        return (blockers & -blockers).bit_length() - 1
+    return blockers.bit_length() - 1
+
+
+def bishop_attacks(sq: int, occupied: int) -> int:
+    return (_up(_NE, sq, occupied) | _up(_NW, sq, occupied) |
+            _down(_SE, sq, occupied) | _down(_SW, sq, occupied))
+
+
+def rook_attacks(sq: int, occupied: int) -> int:
+    return (_up(_N, sq, occupied) | _up(_E, sq, occupied) |
+            _down(_S, sq, occupied) | _down(_W, sq, occupied))
+
+
+def queen_attacks(sq: int, occupied: int) -> int:
+    return bishop_attacks(sq, occupied) | rook_attacks(sq, occupied)
+
+
+# ------------------------------ Atacantes ----------------------------------
+
+def attackers_to(pieces: List[int], occupied: int, sq: int, by_color: int) -> int:
+    """
+    Máscara con las piezas de 'by_color' (0/1) que atacan 'sq'.
+    'pieces' son los 12 bitboards de BitboardPosition; 'occupied' puede
+    diferir de la ocupación real (útil para simular capturas).
+    """
+    base = by_color * 6
+    attackers = (
+        (PAWN_ATTACKS[1 - by_color][sq] & pieces[base]) |
+        (KNIGHT_ATTACKS[sq] & pieces[base + 1]) |
+        (KING_ATTACKS[sq] & pieces[base + 5])
+    )
+    queens = pieces[base + 4]
+    diag = pieces[base + 2] | queens
+    if diag:
+        attackers |= bishop_attacks(sq, occupied) & diag
+    orth = pieces[base + 3] | queens
+    if orth:
+        attackers |= rook_attacks(sq, occupied) & orth
+    return attackers & occupied
+
+
+def is_attacked(pieces: List[int], occupied: int, sq: int, by_color: int) -> bool:
+    """Como attackers_to, pero corta en el primer atacante encontrado."""
+    base = by_color * 6
+    if PAWN_ATTACKS[1 - by_color][sq] & pieces[base]:
+        return True
+    if KNIGHT_ATTACKS[sq] & pieces[base + 1]:
+        return True
+    if KING_ATTACKS[sq] & pieces[base + 5]:
+        return True
+    queens = pieces[base + 4]
+    diag = pieces[base + 2] | queens
+    if diag and bishop_attacks(sq, occupied) & diag:
+        return True
+    orth = pieces[base + 3] | queens
+    if orth and rook_attacks(sq, occupied) & orth:
+        return True
+    return False
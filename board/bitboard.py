@@ -0,0 +1,404 @@
+from typing import List, NamedTuple, Optional, Tuple
+
+from board.attacks import (
+    FULL, FILE_A, NORTH, SOUTH, shift,
+    KNIGHT_ATTACKS, KING_ATTACKS, PAWN_ATTACKS,
+    bishop_attacks, rook_attacks, queen_attacks,
+    attackers_to, is_attacked,
+)
+from board.zobrist import PIECE_KEYS, state_key
+from board.pst import PST_MG, PST_EG, PHASE
+
+# ---------------------------------------------------------------------
+# Representación de la posición con bitboards.
+#
+# Casillas: 0..63, a1 = 0, b1 = 1, ..., h1 = 7, a2 = 8, ..., h8 = 63
+#   índice = (row - 1) * 8 + (ord(col) - ord('a'))
+# Piezas: código = color * 6 + tipo
+#   color: 0 blancas, 1 negras
+#   tipo:  0 peón, 1 caballo, 2 alfil, 3 torre, 4 dama, 5 rey
+# ---------------------------------------------------------------------
+
+FILES = "abcdefgh"
+
+PIECE_NAMES = ("pawn", "knight", "bishop", "rook", "queen", "king")
+COLORS = ("white", "black")
+PIECE_INDEX = {name: i for i, name in enumerate(PIECE_NAMES)}
+COLOR_INDEX = {color: i for i, color in enumerate(COLORS)}
+
+PAWN, KNIGHT, BISHOP, ROOK, QUEEN, KING = range(6)
+WHITE, BLACK = 0, 1  # mismos valores que board.attacks
+
+# Derechos de enroque (bits de BitboardPosition.castling)
+CASTLE_WK, CASTLE_WQ, CASTLE_BK, CASTLE_BQ = 1, 2, 4, 8
+ALL_CASTLING = CASTLE_WK | CASTLE_WQ | CASTLE_BK | CASTLE_BQ
+
+START_FEN = "rnbqkbnr/pppppppp/8/8/8/8/PPPPPPPP/RNBQKBNR w KQkq - 0 1"
+
+# Letras FEN: mayúscula = blancas
+FEN_LETTER = "PNBRQK"
+_FEN_CASTLING = (("K", CASTLE_WK), ("Q", CASTLE_WQ), ("k", CASTLE_BK), ("q", CASTLE_BQ))
+
+# Derechos que se conservan cuando algo sale de / llega a cada casilla
+CASTLING_KEEP = [ALL_CASTLING] * 64
+CASTLING_KEEP[0] ^= CASTLE_WQ                # a1
+CASTLING_KEEP[7] ^= CASTLE_WK                # h1
+CASTLING_KEEP[4] ^= CASTLE_WK | CASTLE_WQ    # e1
+CASTLING_KEEP[56] ^= CASTLE_BQ               # a8
+CASTLING_KEEP[63] ^= CASTLE_BK               # h8
+CASTLING_KEEP[60] ^= CASTLE_BK | CASTLE_BQ   # e8
+
+KING_HOME = (4, 60)                          # e1, e8: únicas casillas desde las que se enroca
+
+
+# --------------------------- Helpers de casillas ---------------------------
+
+def square_index(col: str, row: int) -> int:
+    return (row - 1) * 8 + (ord(col) - ord('a'))
+
+
+def square_col_row(sq: int) -> Tuple[str, int]:
+    return FILES[sq & 7], (sq >> 3) + 1
+
+
+def piece_code(name: str, color: str) -> int:
+    return COLOR_INDEX[color] * 6 + PIECE_INDEX[name]
+
+
+def iter_bits(bb: int):
+    """Recorre los índices de los bits encendidos, de menor a mayor."""
+    while bb:
+        lsb = bb & -bb
+        yield lsb.bit_length() - 1
+        bb ^= lsb
+
+
+# ------------------------------- Posición ----------------------------------
+
+class Undo(NamedTuple):
+    """Lo necesario para deshacer una jugada hecha con make_move."""
+    move: int
+    captured: Optional[int]     # código de la pieza capturada (o None)
+    captured_sq: int            # casilla de la captura (distinta de destino al paso)
+    ep_square: Optional[int]
+    castling: int
+    halfmove: int
+    key: int                    # clave Zobrist antes de la jugada
+    castled: bool = False       # la jugada movió también la torre (enroque)
+
+
+class BitboardPosition:
+    """
+    Posición en 12 bitboards (uno por tipo/color) más máscaras de ocupación.
+    Se mantiene sincronizada con Board.board (ver Board._set_piece_at) o puede
+    usarse por sí sola.
+    """
+
+    def __init__(self):
+        self.pieces: List[int] = [0] * 12
+        self.occupancy: List[int] = [0, 0]
+        self.occupied: int = 0
+        # Código de pieza por casilla (None = vacía) para lecturas O(1)
+        self.mailbox: List[Optional[int]] = [None] * 64
+        # Estado que no se ve en las piezas
+        self.turn: str = "white"
+        self.castling: int = 0
+        self.ep_square: Optional[int] = None
+        self.halfmove: int = 0
+        # Pila de deshacer (una entrada por make_move)
+        self.undo_stack: List[Undo] = []
+        # Parte de la clave Zobrist que aportan las piezas (se actualiza en _put/_remove)
+        self.piece_key: int = 0
+        # Términos de la evaluación (engine/evaluation.py), también incrementales
+        self.mg: int = 0
+        self.eg: int = 0
+        self.phase: int = 0
+
+    @classmethod
+    def from_board(cls, board) -> "BitboardPosition":
+        """Construye la posición a partir de un array 8x8 de piezas (Board.board)."""
+        pos = cls()
+        for r in range(8):
+            for c in range(8):
+                p = board.board[r][c]
+                if p:
+                    pos.set_piece(r * 8 + c, p.name, p.color)
+        return pos
+
+    @classmethod
+    def starting(cls) -> "BitboardPosition":
+        """Posición inicial estándar, blancas mueven."""
+        pos = cls()
+        back = ("rook", "knight", "bishop", "queen", "king", "bishop", "knight", "rook")
+        for f, name in enumerate(back):
+            pos.set_piece(f, name, "white")
+            pos.set_piece(8 + f, "pawn", "white")
+            pos.set_piece(48 + f, "pawn", "black")
+            pos.set_piece(56 + f, name, "black")
+        pos.castling = ALL_CASTLING
+        return pos
+
+    @classmethod
+    def from_fen(cls, fen: str) -> "BitboardPosition":
+        """Posición desde una cadena FEN (los dos contadores son opcionales)."""
+        parts = fen.split()
+        if len(parts) < 4:
+            raise ValueError(f"FEN inválido: {fen}")
+        rows = parts[0].split("/")
+        if len(rows) != 8:
+            raise ValueError(f"FEN inválido: {fen}")
+        pos = cls()
+        for i, row in enumerate(rows):
+            sq = (7 - i) * 8
+            for ch in row:
+                if ch.isdigit():
+                    sq += int(ch)
+                    continue
+                kind = FEN_LETTER.find(ch.upper())
+                if kind < 0:
+                    raise ValueError(f"Pieza inválida en FEN: {ch}")
+                pos._put(sq, kind if ch.isupper() else 6 + kind)
+                sq += 1
+        pos.turn = "white" if parts[1] == "w" else "black"
+        pos.castling = sum(bit for letter, bit in _FEN_CASTLING if letter in parts[2])
+        pos.ep_square = None if parts[3] == "-" else square_index(parts[3][0], int(parts[3][1]))
+        pos.halfmove = int(parts[4]) if len(parts) > 4 else 0
+        return pos
+
+    def to_fen(self, fullmove: int = 1) -> str:
+        rows = []
+        for r in range(7, -1, -1):
+            row, empty = "", 0
+            for c in range(8):
+                code = self.mailbox[r * 8 + c]
+                if code is None:
+                    empty += 1
+                    continue
+                if empty:
+                    row, empty = row + str(empty), 0
+                letter = FEN_LETTER[code % 6]
+                row += letter if code < 6 else letter.lower()
+            rows.append(row + (str(empty) if empty else ""))
+        castling = "".join(letter for letter, bit in _FEN_CASTLING if self.castling & bit) or "-"
+        ep = "-" if self.ep_square is None else "%s%d" % square_col_row(self.ep_square)
+        return f"{'/'.join(rows)} {self.turn[0]} {castling} {ep} {self.halfmove} {fullmove}"
+
+    def copy(self) -> "BitboardPosition":
+        pos = BitboardPosition.__new__(BitboardPosition)
+        pos.__dict__.update(self.__dict__)
+        pos.pieces = list(self.pieces)
+        pos.occupancy = list(self.occupancy)
+        pos.mailbox = list(self.mailbox)
+        pos.undo_stack = list(self.undo_stack)
+        return pos
+
+    # --------------------------- Getters / Setters ---------------------------
+
+    def piece_at(self, sq: int) -> Optional[Tuple[str, str]]:
+        code = self.mailbox[sq]
+        if code is None:
+            return None
+        return PIECE_NAMES[code % 6], COLORS[code // 6]
+
+    def set_piece(self, sq: int, name: Optional[str], color: Optional[str] = None) -> None:
+        self.clear(sq)
+        if name is None:
+            return
+        self._put(sq, piece_code(name, color))
+
+    def clear(self, sq: int) -> None:
+        code = self.mailbox[sq]
+        if code is not None:
+            self._remove(sq, code)
+
+    def _put(self, sq: int, code: int) -> None:
+        bit = 1 << sq
+        self.pieces[code] |= bit
+        self.occupancy[code // 6] |= bit
+        self.occupied |= bit
+        self.mailbox[sq] = code
+        self.piece_key ^= PIECE_KEYS[code][sq]
+        self.mg += PST_MG[code][sq]
+        self.eg += PST_EG[code][sq]
+        self.phase += PHASE[code]
+
+    def _remove(self, sq: int, code: int) -> None:
+        mask = ~(1 << sq)
+        self.pieces[code] &= mask
+        self.occupancy[code // 6] &= mask
+        self.occupied &= mask
+        self.mailbox[sq] = None
+        self.piece_key ^= PIECE_KEYS[code][sq]
+        self.mg -= PST_MG[code][sq]
+        self.eg -= PST_EG[code][sq]
+        self.phase -= PHASE[code]
+
+    @property
+    def key(self) -> int:
+        """
+        Clave Zobrist: piezas (incremental) + turno, enroques y columna de
+        en passant (tres XOR sobre tablas, sin recorrer el tablero).
+        """
+        return self.piece_key ^ state_key(self.turn, self.castling, self.ep_square)
+
+    def is_repetition(self, count: int = 1) -> bool:
+        """True si la posición actual ya ocurrió 'count' veces desde la última captura o peón."""
+        key = self.key
+        stack = self.undo_stack
+        seen = 0
+        # Solo puede repetirse con el mismo bando al turno: se mira de a dos
+        for i in range(len(stack) - 2, max(len(stack) - self.halfmove, 0) - 1, -2):
+            if stack[i].key == key:
+                seen += 1
+                if seen >= count:
+                    return True
+        return False
+
+    def bitboard(self, name: str, color: str) -> int:
+        return self.pieces[piece_code(name, color)]
+
+    # ------------------------ Ataque / Defensa básica ------------------------
+
+    def attackers_to(self, sq: int, by_color: str, occupied: Optional[int] = None) -> int:
+        """Máscara con todas las piezas de 'by_color' que atacan la casilla."""
+        occ = self.occupied if occupied is None else occupied
+        return attackers_to(self.pieces, occ, sq, COLOR_INDEX[by_color])
+
+    def is_square_attacked(self, sq: int, by_color: str) -> bool:
+        return is_attacked(self.pieces, self.occupied, sq, COLOR_INDEX[by_color])
+
+    def king_square(self, color: str) -> Optional[int]:
+        kings = self.pieces[COLOR_INDEX[color] * 6 + KING]
+        if not kings:
+            return None
+        return (kings & -kings).bit_length() - 1
+
+    # ---------------------------- make / unmake ------------------------------
+
+    def make_move(self, move: int) -> Undo:
+        """
+        Aplica una jugada codificada (ver board/movegen.py) y apila su Undo.
+        No verifica legalidad. Detecta enroque (rey dos columnas), captura al
+        paso (peón en diagonal a ep_square vacía) y promoción.
+        """
+        src = move & 63
+        dst = (move >> 6) & 63
+        promo = move >> 12
+        mailbox = self.mailbox
+        code = mailbox[src]
+        if code is None:
+            raise ValueError(f"No hay pieza en la casilla {src} para mover.")
+        kind = code % 6
+
+        captured = mailbox[dst]
+        captured_sq = dst
+        if kind == PAWN and captured is None and dst == self.ep_square and (src ^ dst) & 7:
+            captured_sq = dst - 8 if code < 6 else dst + 8
+            captured = mailbox[captured_sq]
+
+        # Enroque: rey desde e1/e8 dos columnas hacia una torre propia. Con
+        # cualquier otra cosa (p. ej. Kf1-h1 sin validar) no se toca la torre.
+        rook_from = rook_to = None
+        if kind == KING and src in KING_HOME and abs(dst - src) == 2:
+            rook_from, rook_to = (src + 3, src + 1) if dst > src else (src - 4, src - 1)
+            if mailbox[rook_from] != code - KING + ROOK:
+                rook_from = rook_to = None
+            elif mailbox[rook_to] is not None:
+                raise ValueError(f"Enroque {src}->{dst} con la casilla {rook_to} ocupada.")
+
+        undo = Undo(move, captured, captured_sq, self.ep_square, self.castling, self.halfmove, self.key,
+                    rook_from is not None)
+        self.undo_stack.append(undo)
+
+        if captured is not None:
+            self._remove(captured_sq, captured)
+        self._remove(src, code)
+        self._put(dst, code - kind + promo if promo else code)
+
+        if rook_from is not None:
+            # la torre salta al otro lado del rey
+            rook = mailbox[rook_from]
+            self._remove(rook_from, rook)
+            self._put(rook_to, rook)
+
+        self.castling &= CASTLING_KEEP[src] & CASTLING_KEEP[dst]
+        self.ep_square = (src + dst) >> 1 if kind == PAWN and abs(dst - src) == 16 else None
+        self.halfmove = 0 if kind == PAWN or captured is not None else self.halfmove + 1
+        self.turn = "black" if self.turn == "white" else "white"
+        return undo
+
+    def unmake_move(self) -> Undo:
+        """Deshace la última jugada de make_move y devuelve su Undo."""
+        undo = self.undo_stack.pop()
+        move = undo.move
+        src = move & 63
+        dst = (move >> 6) & 63
+        promo = move >> 12
+        code = self.mailbox[dst]
+        if promo:
+            self._remove(dst, code)
+            code = code - code % 6 + PAWN
+        else:
+            self._remove(dst, code)
+        self._put(src, code)
+
+        if undo.castled:
+            rook_from, rook_to = (src + 3, src + 1) if dst > src else (src - 4, src - 1)
+            rook = self.mailbox[rook_to]
+            self._remove(rook_to, rook)
+            self._put(rook_from, rook)
+
+        if undo.captured is not None:
+            self._put(undo.captured_sq, undo.captured)
+
+        self.ep_square = undo.ep_square
+        self.castling = undo.castling
+        self.halfmove = undo.halfmove
+        self.turn = "black" if self.turn == "white" else "white"
+        return undo
+
+    # ------------------------ Búsqueda de orígenes (SAN) ---------------------
+
+    def find_sources(self, piece_name: str, color: str, to_sq: int, origin_file: Optional[str] = None) -> List[int]:
+        """
+        Equivalente por máscaras de Board.find_sources: casillas de origen de
+        piezas 'piece_name'/'color' que llegan a 'to_sq' por patrón básico.
+        """
+        c = COLOR_INDEX[color]
+        target = 1 << to_sq
+        if self.occupancy[c] & target:
+            return []
+
+        own = self.pieces[c * 6 + PIECE_INDEX[piece_name]]
+        file_mask = FULL
+        if origin_file:
+            file_mask = FILE_A << FILES.index(origin_file)
+
+        if piece_name == "pawn":
+            # Capturas: mismos orígenes que los ataques de un peón rival en destino
+            res = list(iter_bits(PAWN_ATTACKS[1 - c][to_sq] & own & file_mask))
+            back = SOUTH if c == WHITE else NORTH
+            empty = ~self.occupied & FULL
+            one = shift(target & empty, back)
+            if one & own:
+                res.append(one.bit_length() - 1)
+            # doble avance: destino en fila 4 (blancas) / 5 (negras)
+            double_rank = 0xFF << (24 if c == WHITE else 32)
+            two = shift(one & empty, back)
+            if target & double_rank and two & own:
+                res.append(two.bit_length() - 1)
+            return res
+
+        if piece_name == "knight":
+            reach = KNIGHT_ATTACKS[to_sq]
+        elif piece_name == "king":
+            reach = KING_ATTACKS[to_sq]
+        elif piece_name == "bishop":
+            reach = bishop_attacks(to_sq, self.occupied)
+        elif piece_name == "rook":
+            reach = rook_attacks(to_sq, self.occupied)
+        elif piece_name == "queen":
+            reach = queen_attacks(to_sq, self.occupied)
+        else:
+            return []
+        return list(iter_bits(reach & own & file_mask))
@@ -1,29 +1,33 @@
 from typing import Optional, List, Tuple, Dict, Any
 
 from board.coordenates import Coordenate
-from pieces.pawn import Pawn
-from pieces.knight import Knight
-from pieces.bishop import Bishop
-from pieces.rook import Rook
-from pieces.queen import Queen
-from pieces.king import King
+from board.attacks import BETWEEN, first_blocker
+from board.bitboard import (
+    BitboardPosition, square_index, iter_bits, PIECE_NAMES,
+    CASTLE_WK, CASTLE_WQ, CASTLE_BK, CASTLE_BQ, ALL_CASTLING,
+)
+from pieces.flyweight import PIECES, PieceType, piece_for
 
 FILES = "abcdefgh"
 
 
 class Board:
     def __init__(self):
-        # Crea el array 2D vacío
-        self.board: List[List[Optional[object]]] = self._empty_board()
-        # Coloca las piezas en su posición inicial (instanciando primero)
+        # Crea el array 2D vacío; cada casilla guarda uno de los 12 flyweights (pieces/flyweight.py)
+        self.board: List[List[Optional[PieceType]]] = self._empty_board()
+        # Espejo en bitboards, sincronizado en cada _set_piece_at. Es también
+        # dueño del estado de partida: turno, enroques, en passant, reloj.
+        self.bb = BitboardPosition()
+        # Coloca las piezas en su posición inicial
         self._place_initial_position()
+        self.bb.castling = ALL_CASTLING
 
     # ------------------------------------------------------------------ utils
     def _C(self, col: str, row: int) -> Coordenate:
         """Helper: crea Coordenate usando el orden correcto (row, col)."""
         return Coordenate(row, col)
 
-    def _empty_board(self) -> List[List[Optional[object]]]:
+    def _empty_board(self) -> List[List[Optional[PieceType]]]:
         return [[None for _ in range(8)] for _ in range(8)]
 
     def _place_initial_position(self) -> None:
@@ -46,28 +50,37 @@ class Board:
             ("rook",   "h"),
         ]
         for name, col in pieces_order:
-            piece = self._make_piece(name, color, col, row)
-            self._set_piece_at(self._C(col, row), piece)
+            self._set_piece_at(self._C(col, row), self._make_piece(name, color))
 
     def _place_pawns(self, color: str, row: int) -> None:
         for col in FILES:
-            piece = Pawn(color, col, row)
-            self._set_piece_at(self._C(col, row), piece)
-
-    def _make_piece(self, name: str, color: str, col: str, row: int):
-        if name == "rook":
-            return Rook(color, col, row)
-        if name == "knight":
-            return Knight(color, col, row)
-        if name == "bishop":
-            return Bishop(color, col, row)
-        if name == "queen":
-            return Queen(color, col, row)
-        if name == "king":
-            return King(color, col, row)
-        if name == "pawn":
-            return Pawn(color, col, row)
-        raise ValueError(f"Pieza desconocida: {name}")
+            self._set_piece_at(self._C(col, row), self._make_piece("pawn", color))
+
+    @classmethod
+    def from_fen(cls, fen: str) -> "Board":
+        """Tablero desde una cadena FEN (turno, enroques y en passant quedan en self.bb)."""
+        board = cls.__new__(cls)
+        board.bb = BitboardPosition.from_fen(fen)
+        board.board = board._empty_board()
+        board._refresh(range(64))
+        return board
+
+    def copy(self) -> "Board":
+        """Copia independiente: las piezas son flyweights, así que basta copiar filas y bb."""
+        board = Board.__new__(Board)
+        board.board = [list(row) for row in self.board]
+        board.bb = self.bb.copy()
+        return board
+
+    @property
+    def key(self) -> int:
+        """Clave Zobrist de la posición (ver board/zobrist.py)."""
+        return self.bb.key
+
+    def _make_piece(self, name: str, color: str) -> PieceType:
+        if name not in PIECE_NAMES:
+            raise ValueError(f"Pieza desconocida: {name}")
+        return piece_for(name, color)
 
     # --------------------------- Conversión índices --------------------------
 
@@ -88,16 +101,27 @@ class Board:
         r_i, c_i = self._coord_to_idx(coord)
         return self.board[r_i][c_i]
 
-    def _set_piece_at(self, coord: Coordenate, piece: Optional[object]) -> None:
+    def _set_piece_at(self, coord: Coordenate, piece: Optional[PieceType]) -> None:
         r_i, c_i = self._coord_to_idx(coord)
         self.board[r_i][c_i] = piece
+        if piece is None:
+            self.bb.clear(r_i * 8 + c_i)
+        else:
+            self.bb.set_piece(r_i * 8 + c_i, piece.name, piece.color)
+
+    def sync_bitboards(self) -> None:
+        """Reconstruye self.bb desde self.board (si se editó el array a mano)."""
+        old = self.bb
+        self.bb = BitboardPosition.from_board(self)
+        self.bb.turn = old.turn
+        self.bb.castling = self._castling_from_pieces(old.castling)
 
     def is_empty(self, coord: Coordenate) -> bool:
         return self.get_piece_at(coord) is None
 
     def piece_color_at(self, coord: Coordenate) -> Optional[str]:
         p = self.get_piece_at(coord)
-        return getattr(p, "color", None) if p else None
+        return p.color if p else None
 
     # ----------------------------- Utilidades --------------------------------
 
@@ -109,102 +133,54 @@ class Board:
         return Coordenate(int(square[1]), square[0])
 
     def king_position(self, color: str) -> Coordenate:
-        for r in range(8):
-            for c in range(8):
-                p = self.board[r][c]
-                if p and getattr(p, "color", None) == color and getattr(p, "name", getattr(p, "type", None)) == "king":
-                    return self._idx_to_coord(r, c)
-        raise ValueError(f"No se encontró el rey de color {color}")
+        sq = self.bb.king_square(color)
+        if sq is None:
+            raise ValueError(f"No se encontró el rey de color {color}")
+        return self._idx_to_coord(sq >> 3, sq & 7)
+
+    def castling_rights(self) -> int:
+        """Bits de enroque (CASTLE_*) vigentes; los mantiene make_move en self.bb."""
+        return self.bb.castling
+
+    def ep_target(self) -> Optional[Coordenate]:
+        """Casilla de captura al paso disponible (o None)."""
+        sq = self.bb.ep_square
+        return None if sq is None else self._idx_to_coord(sq >> 3, sq & 7)
+
+    def _castling_from_pieces(self, rights: int) -> int:
+        # Conserva los derechos cuyo rey y torre siguen en su casilla inicial
+        for color, back, k_bit, q_bit in (("white", 1, CASTLE_WK, CASTLE_WQ),
+                                          ("black", 8, CASTLE_BK, CASTLE_BQ)):
+            if not self._is_piece(Coordenate(back, "e"), "king", color):
+                rights &= ~(k_bit | q_bit)
+            if not self._is_piece(Coordenate(back, "h"), "rook", color):
+                rights &= ~k_bit
+            if not self._is_piece(Coordenate(back, "a"), "rook", color):
+                rights &= ~q_bit
+        return rights
 
     def squares_between(self, a: Coordenate, b: Coordenate) -> List[Coordenate]:
-        # Devuelve las casillas estrictamente entre a y b si están alineadas en recta/diagonal
-        res: List[Coordenate] = []
-        df = (ord(b.col) - ord(a.col))
-        dr = (b.row - a.row)
-        step_f = 0 if df == 0 else (1 if df > 0 else -1)
-        step_r = 0 if dr == 0 else (1 if dr > 0 else -1)
-
-        # Si no comparten línea recta ni diagonal, no hay "entre"
-        if not (df == 0 or dr == 0 or abs(df) == abs(dr)):
-            return res
-
-        f = ord(a.col) + step_f
-        r = a.row + step_r
-        while (f != ord(b.col)) or (r != b.row):
-            if (f == ord(b.col)) and (r == b.row):
-                break
-            # Coordenate(row, col)
-            res.append(Coordenate(r, chr(f)))
-            f += step_f
-            r += step_r
-            if chr(f) == b.col and r == b.row:
-                break
-        # quitar extremos si se metió el destino por la condición
-        return [c for c in res if not (c.col == b.col and c.row == b.row)]
+        # Casillas estrictamente entre a y b (de a hacia b) si están alineadas en recta/diagonal
+        sa = square_index(a.col, a.row)
+        sb = square_index(b.col, b.row)
+        squares = list(iter_bits(BETWEEN[sa][sb]))
+        if sb < sa:
+            squares.reverse()
+        return [self._idx_to_coord(sq >> 3, sq & 7) for sq in squares]
 
     # ------------------------ Ataque / Defensa básica ------------------------
 
     def is_square_attacked(self, coord: Coordenate, by_color: str) -> bool:
-        # Ataques de peones
-        for df in (-1, 1):
-            r = coord.row + (-1 if by_color == "white" else 1)
-            f = chr(ord(coord.col) + df)
-            if f in FILES and 1 <= r <= 8:
-                c = Coordenate(r, f)  # row, col
-                p = self.get_piece_at(c)
-                if p and getattr(p, "color", None) == by_color and getattr(p, "name", getattr(p, "type", None)) == "pawn":
-                    return True
-
-        # Ataques de caballos
-        for df, dr in [(1,2),(2,1),(2,-1),(1,-2),(-1,-2),(-2,-1),(-2,1),(-1,2)]:
-            r = coord.row + dr
-            f = chr(ord(coord.col) + df)
-            if f in FILES and 1 <= r <= 8:
-                c = Coordenate(r, f)  # row, col
-                p = self.get_piece_at(c)
-                if p and getattr(p, "color", None) == by_color and getattr(p, "name", getattr(p, "type", None)) == "knight":
-                    return True
-
-        # Rayos diagonales (alfiles/reinas)
-        for df, dr in [(1,1),(1,-1),(-1,1),(-1,-1)]:
-            if self._ray_hits(coord, df, dr, by_color, ("bishop","queen")):
-                return True
-
-        # Rayos ortogonales (torres/reinas)
-        for df, dr in [(1,0),(-1,0),(0,1),(0,-1)]:
-            if self._ray_hits(coord, df, dr, by_color, ("rook","queen")):
-                return True
-
-        # Rey adyacente
-        for df in (-1,0,1):
-            for dr in (-1,0,1):
-                if df == 0 and dr == 0:
-                    continue
-                r = coord.row + dr
-                f = chr(ord(coord.col) + df)
-                if f in FILES and 1 <= r <= 8:
-                    c = Coordenate(r, f)  # row, col
-                    p = self.get_piece_at(c)
-                    if p and getattr(p, "color", None) == by_color and getattr(p, "name", getattr(p, "type", None)) == "king":
-                        return True
-
-        return False
+        # Peones, caballos, deslizantes y rey adyacente, todo por máscaras
+        return self.bb.is_square_attacked(square_index(coord.col, coord.row), by_color)
 
     def _ray_hits(self, target: Coordenate, df: int, dr: int, by_color: str, sliding: Tuple[str, ...]) -> bool:
-        f_i = ord(target.col) - ord('a')
-        r_i = target.row - 1
-        while True:
-            f_i += df
-            r_i += dr
-            if not (0 <= f_i < 8 and 0 <= r_i < 8):
-                return False
-            c = self._idx_to_coord(r_i, f_i)
-            p = self.get_piece_at(c)
-            if p:
-                name = getattr(p, "name", getattr(p, "type", None))
-                if getattr(p, "color", None) == by_color and name in sliding:
-                    return True
-                return False
+        # Primer bloqueador del rayo (mismo recorrido que los deslizantes de generate_moves)
+        first = first_blocker(dr * 8 + df, square_index(target.col, target.row), self.bb.occupied)
+        if first is None:
+            return False
+        p = self.bb.piece_at(first)
+        return p[1] == by_color and p[0] in sliding
 
     # ------------------------ Búsqueda de orígenes (SAN) ---------------------
 
@@ -214,55 +190,48 @@ class Board:
         y sin capturar aliado. Para peones, usa origin_file si viene en san_hint.
         (No verifica jaque propio ni "pinned"; eso lo resuelve un gestor superior.)
         """
-        candidates: List[Coordenate] = []
         origin_file = san_hint.get("origin_file")
+        to_sq = square_index(to_coord.col, to_coord.row)
+        return [
+            self._idx_to_coord(sq >> 3, sq & 7)
+            for sq in self.bb.find_sources(piece_name, color, to_sq, origin_file)
+        ]
 
-        # Peones: tratar distinto porque dependen del color/dirección
-        if piece_name == "pawn":
-            # Captura: archivo distinto y una fila adelante
-            for df in (-1, 1):
-                f = chr(ord(to_coord.col) + df)
-                if origin_file and f != origin_file:
-                    continue
-                src = Coordenate(to_coord.row - (1 if color == "white" else -1), f)  # row, col
-                if self._on_board(src) and self._is_piece(src, "pawn", color):
-                    candidates.append(src)
-
-            # Avances rectos (1 o 2)
-            f = to_coord.col
-            one = Coordenate(to_coord.row - (1 if color == "white" else -1), f)
-            if self._on_board(one) and self._is_piece(one, "pawn", color) and self.is_empty(to_coord):
-                candidates.append(one)
-            # doble (desde inicial)
-            start = 2 if color == "white" else 7
-            two = Coordenate(to_coord.row - (2 if color == "white" else -2), f)
-            inter = Coordenate(start + (1 if color == "white" else -1), f) if to_coord.row == (start + (2 if color == "white" else -2)) else None
-            if self._on_board(two) and self._is_piece(two, "pawn", color) and inter and self.is_empty(inter) and self.is_empty(to_coord):
-                candidates.append(two)
-
-            return self._filter_same_color_at_dest(candidates, color, to_coord)
-
-        # Otras piezas: barrido por el tablero y patrón básico
-        for r in range(8):
-            for c in range(8):
-                coord = self._idx_to_coord(r, c)
-                p = self.get_piece_at(coord)
-                if not p:
-                    continue
-                name = getattr(p, "name", getattr(p, "type", None))
-                col = getattr(p, "color", None)
-                if name != piece_name or col != color:
-                    continue
-                if self._pattern_ok(coord, to_coord, name) and not self._same_color_at(to_coord, color):
-                    # Si hay origin_file, filtrar por archivo
-                    if origin_file and coord.col != origin_file:
-                        continue
-                    # camino libre si desliza
-                    if name in ("bishop","rook","queen") and not self._path_clear(coord, to_coord):
-                        continue
-                    candidates.append(coord)
-
-        return candidates
+    # ---------------------------- make / unmake ------------------------------
+
+    def make_move(self, move: int) -> None:
+        """
+        Aplica una jugada codificada (ver board/movegen.py) en self.bb con su
+        make_move y refleja el cambio en el array 8x8. unmake_move la deshace
+        (takeback), así que no hace falta copiar ni reconstruir el tablero.
+        """
+        undo = self.bb.make_move(move)  # falla si no hay pieza en src
+        self._refresh(self._touched(undo))
+
+    def unmake_move(self) -> Optional[int]:
+        """Deshace la última jugada de make_move. Devuelve la jugada o None si no hay."""
+        if not self.bb.undo_stack:
+            return None
+        undo = self.bb.unmake_move()
+        self._refresh(self._touched(undo))
+        return undo.move
+
+    def _touched(self, undo) -> List[int]:
+        # Casillas que cambian con la jugada: origen, destino, captura y, en
+        # el enroque, las de la torre
+        src = undo.move & 63
+        dst = (undo.move >> 6) & 63
+        squares = [src, dst, undo.captured_sq]
+        if undo.castled:
+            squares += (src + 3, src + 1) if dst > src else (src - 4, src - 1)
+        return squares
+
+    def _refresh(self, squares) -> None:
+        # Copia al array 8x8 lo que dice self.bb.mailbox (las piezas son flyweights)
+        mailbox = self.bb.mailbox
+        for sq in squares:
+            code = mailbox[sq]
+            self.board[sq >> 3][sq & 7] = None if code is None else PIECES[code]
 
     # ----------------------------- apply_move --------------------------------
 
@@ -299,13 +268,6 @@ class Board:
         # Mover
         self._set_piece_at(src, None)
         self._set_piece_at(dst, mover)
-        # Actualizar pos interna de la pieza (usando su método move por vector)
-        try:
-            vector_row = dst.row - src.row
-            vector_col = (ord(dst.col) - ord(src.col))
-            mover.move(vector_row=vector_row, vector_col=vector_col)
-        except Exception:
-            pass
 
         # Promoción
         promo = getattr(move, "promotion", None)
@@ -313,8 +275,7 @@ class Board:
             promo_map = {"q": "queen", "r": "rook", "b": "bishop", "n": "knight"}
             name = promo_map.get(promo.lower())
             if name:
-                new_piece = self._make_piece(name, getattr(mover, "color", None), dst.col, dst.row)
-                self._set_piece_at(dst, new_piece)
+                self._set_piece_at(dst, self._make_piece(name, mover.color))
 
     def _apply_castle(self, color: str, side: str) -> None:
         back = 1 if color == "white" else 8
@@ -335,12 +296,6 @@ class Board:
         self._set_piece_at(king_to, king)
         self._set_piece_at(rook_to, rook)
 
-        # Actualizar internas de movimiento (opcional)
-        try:
-            king.move(vector_row=0, vector_col=(ord(king_to.col) - ord(king_from.col)))
-        except Exception:
-            pass
-
     # ---------------------------- Helpers internos ---------------------------
 
     def _on_board(self, c: Coordenate) -> bool:
@@ -348,15 +303,11 @@ class Board:
 
     def _is_piece(self, coord: Coordenate, name: str, color: str) -> bool:
         p = self.get_piece_at(coord)
-        if not p:
-            return False
-        pname = getattr(p, "name", getattr(p, "type", None))
-        pcolor = getattr(p, "color", None)
-        return pname == name and pcolor == color
+        return p is not None and p.name == name and p.color == color
 
     def _same_color_at(self, coord: Coordenate, color: str) -> bool:
         p = self.get_piece_at(coord)
-        return bool(p) and getattr(p, "color", None) == color
+        return p is not None and p.color == color
 
     def _pattern_ok(self, src: Coordenate, dst: Coordenate, name: str) -> bool:
         df = (ord(dst.col) - ord(src.col))
@@ -380,8 +331,8 @@ class Board:
 
     def _path_clear(self, src: Coordenate, dst: Coordenate) -> bool:
         # Para piezas deslizantes (bishop/rook/queen)
-        between = self.squares_between(src, dst)
-        return all(self.is_empty(c) for c in between)
+        between = BETWEEN[square_index(src.col, src.row)][square_index(dst.col, dst.row)]
+        return not between & self.bb.occupied
 
     # ----------------------------- Debug opcional ----------------------------
 
@@ -390,27 +341,12 @@ class Board:
         Devuelve una representación simple del tablero:
         P (peón), N, B, R, Q, K en may/min para blancas/negras.
         """
-        letter = {
-            "pawn": "P",
-            "knight": "N",
-            "bishop": "B",
-            "rook": "R",
-            "queen": "Q",
-            "king": "K",
-        }
         lines: List[str] = []
         for r in range(7, -1, -1):
             row = []
             for c in range(8):
                 p = self.board[r][c]
-                if not p:
-                    row.append(".")
-                else:
-                    name = getattr(p, "name", getattr(p, "type", None))
-                    ch = letter.get(name, "?")
-                    if getattr(p, "color", None) == "black":
-                        ch = ch.lower()
-                    row.append(ch)
+                row.append(p.letter if p else ".")
             lines.append(f"{r+1} " + " ".join(row))
         lines.append("  a b c d e f g h")
         return "\n".join(lines)
@@ -1,4 +1,6 @@
 class Coordenate:
+    __slots__ = ("row", "col")  # sin __dict__: se crean muchas
+
     max_row = 7 # En el array
     min_row = 0 # En el array
     max_col = 'h' # Para la notacion
@@ -33,3 +35,12 @@ class Coordenate:
             self.col = chr(min)
         else:
             self.col = chr(result)
+
+
+# ---------- casillas como enteros (0..63, a1 = 0) ----------
+def to_square(c: Coordenate) -> int:
+    return (c.row - 1) * 8 + (ord(c.col) - ord('a'))
+
+
+def from_square(sq: int) -> Coordenate:
+    return Coordenate((sq >> 3) + 1, "abcdefgh"[sq & 7])
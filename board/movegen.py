@@ -0,0 +1,210 @@
+from typing import List, Optional
+
+from board.attacks import (
+    FULL, KNIGHT_ATTACKS, KING_ATTACKS, PAWN_ATTACKS, BETWEEN,
+    bishop_attacks, rook_attacks, attackers_to, is_attacked,
+)
+from board.bitboard import (
+    FILES, COLOR_INDEX, PAWN, KNIGHT, BISHOP, ROOK, QUEEN, KING, WHITE,
+    CASTLE_WK, CASTLE_WQ, CASTLE_BK, CASTLE_BQ, BitboardPosition, iter_bits,
+)
+
+# ---------------------------------------------------------------------
+# Generador de jugadas legales en una sola pasada.
+#
+# Jugada codificada en un int: origen | destino << 6 | promoción << 12
+#   promoción: 0 = ninguna, si no el tipo de pieza (KNIGHT..QUEEN)
+# El enroque es "rey se mueve dos columnas" y la captura al paso es
+# "peón en diagonal a ep_square", igual que las cadenas UCI de game.py.
+#
+# Clavadas y jaques se calculan antes de generar: cada pieza recibe una
+# máscara de destinos permitidos y no hace falta hacer/deshacer jugadas.
+# ---------------------------------------------------------------------
+
+PROMO_LETTER = {KNIGHT: "n", BISHOP: "b", ROOK: "r", QUEEN: "q"}
+LETTER_PROMO = {v: k for k, v in PROMO_LETTER.items()}
+
+RANK_1 = 0xFF
+RANK_8 = 0xFF << 56
+
+
+# ------------------------------ Codificación -------------------------------
+
+def encode_move(src: int, dst: int, promo: int = 0) -> int:
+    return src | (dst << 6) | (promo << 12)
+
+
+def move_src(move: int) -> int:
+    return move & 63
+
+
+def move_dst(move: int) -> int:
+    return (move >> 6) & 63
+
+
+def move_promo(move: int) -> int:
+    return move >> 12
+
+
+def move_to_uci(move: int) -> str:
+    src, dst, promo = move & 63, (move >> 6) & 63, move >> 12
+    uci = f"{FILES[src & 7]}{(src >> 3) + 1}{FILES[dst & 7]}{(dst >> 3) + 1}"
+    return uci + PROMO_LETTER[promo] if promo else uci
+
+
+def move_from_uci(uci: str) -> int:
+    src = (int(uci[1]) - 1) * 8 + FILES.index(uci[0])
+    dst = (int(uci[3]) - 1) * 8 + FILES.index(uci[2])
+    promo = LETTER_PROMO.get(uci[4:5].lower(), 0)
+    return encode_move(src, dst, promo)
+
+
+# ------------------------------- Generación --------------------------------
+
+def in_check(position: BitboardPosition, color: str) -> bool:
+    ksq = position.king_square(color)
+    if ksq is None:
+        return False
+    return is_attacked(position.pieces, position.occupied, ksq, 1 - COLOR_INDEX[color])
+
+
+def generate_legal_moves(position: BitboardPosition, color: str) -> List[int]:
+    """Todas las jugadas legales de 'color' en la posición dada."""
+    us = COLOR_INDEX[color]
+    them = 1 - us
+    pcs = position.pieces
+    occ = position.occupied
+    own = position.occupancy[us]
+    enemy = position.occupancy[them]
+    base = us * 6
+    ebase = them * 6
+    moves: List[int] = []
+
+    kings = pcs[base + KING]
+    if not kings:
+        return moves
+    ksq = kings.bit_length() - 1
+
+    # --- Rey: se prueba cada destino sin el rey en la ocupación (rayos x) ---
+    occ_no_king = occ ^ kings
+    for dst in iter_bits(KING_ATTACKS[ksq] & ~own):
+        if not is_attacked(pcs, occ_no_king, dst, them):
+            moves.append(ksq | (dst << 6))
+
+    checkers = attackers_to(pcs, occ, ksq, them)
+    if checkers & (checkers - 1):
+        # Jaque doble: solo mueve el rey
+        return moves
+
+    if checkers:
+        csq = checkers.bit_length() - 1
+        target_mask = checkers | BETWEEN[ksq][csq]
+    else:
+        target_mask = FULL
+
+    # --- Clavadas: deslizantes enemigos alineados con el rey ---
+    pin_mask = {}
+    snipers = (
+        (rook_attacks(ksq, enemy) & (pcs[ebase + ROOK] | pcs[ebase + QUEEN])) |
+        (bishop_attacks(ksq, enemy) & (pcs[ebase + BISHOP] | pcs[ebase + QUEEN]))
+    )
+    for s in iter_bits(snipers):
+        between = BETWEEN[ksq][s]
+        blockers = between & occ
+        if blockers and not (blockers & (blockers - 1)) and blockers & own:
+            pin_mask[blockers.bit_length() - 1] = between | (1 << s)
+
+    allowed = ~own & target_mask
+
+    # --- Caballos (un caballo clavado nunca se puede mover) ---
+    for src in iter_bits(pcs[base + KNIGHT]):
+        if src in pin_mask:
+            continue
+        for dst in iter_bits(KNIGHT_ATTACKS[src] & allowed):
+            moves.append(src | (dst << 6))
+
+    # --- Deslizantes ---
+    diag = pcs[base + BISHOP] | pcs[base + QUEEN]
+    orth = pcs[base + ROOK] | pcs[base + QUEEN]
+    for src in iter_bits(diag):
+        targets = bishop_attacks(src, occ) & allowed
+        if src in pin_mask:
+            targets &= pin_mask[src]
+        for dst in iter_bits(targets):
+            moves.append(src | (dst << 6))
+    for src in iter_bits(orth):
+        targets = rook_attacks(src, occ) & allowed
+        if src in pin_mask:
+            targets &= pin_mask[src]
+        for dst in iter_bits(targets):
+            moves.append(src | (dst << 6))
+
+    # --- Peones ---
+    forward = 8 if us == WHITE else -8
+    start_rank = 0xFF << (8 if us == WHITE else 48)
+    promo_rank = RANK_8 if us == WHITE else RANK_1
+    for src in iter_bits(pcs[base + PAWN]):
+        limit = target_mask & pin_mask.get(src, FULL)
+        targets = PAWN_ATTACKS[us][src] & enemy
+        one = src + forward
+        if not (occ >> one) & 1:
+            targets |= 1 << one
+            two = one + forward
+            if (1 << src) & start_rank and not (occ >> two) & 1:
+                targets |= 1 << two
+        for dst in iter_bits(targets & limit):
+            if (1 << dst) & promo_rank:
+                for promo in (QUEEN, ROOK, BISHOP, KNIGHT):
+                    moves.append(src | (dst << 6) | (promo << 12))
+            else:
+                moves.append(src | (dst << 6))
+
+    # --- Captura al paso: se verifica con la ocupación resultante ---
+    ep = position.ep_square
+    if ep is not None:
+        cap = ep - forward
+        for src in iter_bits(PAWN_ATTACKS[them][ep] & pcs[base + PAWN]):
+            if not (pcs[ebase + PAWN] >> cap) & 1:
+                break
+            after = (occ ^ (1 << src) ^ (1 << cap)) | (1 << ep)
+            sim = list(pcs)
+            sim[ebase + PAWN] ^= 1 << cap
+            if not is_attacked(sim, after, ksq, them):
+                moves.append(src | (ep << 6))
+
+    # --- Enroque ---
+    if not checkers:
+        if us == WHITE:
+            rights = (CASTLE_WK, CASTLE_WQ)
+        else:
+            rights = (CASTLE_BK, CASTLE_BQ)
+        castling = position.castling
+        if castling & rights[0]:
+            f, g = ksq + 1, ksq + 2
+            if (not (occ >> f) & 1 and not (occ >> g) & 1
+                    and not is_attacked(pcs, occ, f, them)
+                    and not is_attacked(pcs, occ, g, them)):
+                moves.append(ksq | (g << 6))
+        if castling & rights[1]:
+            d, c, b = ksq - 1, ksq - 2, ksq - 3
+            if (not (occ >> d) & 1 and not (occ >> c) & 1 and not (occ >> b) & 1
+                    and not is_attacked(pcs, occ, d, them)
+                    and not is_attacked(pcs, occ, c, them)):
+                moves.append(ksq | (c << 6))
+
+    return moves
+
+
+def legal_moves_from(position: BitboardPosition, color: str, src: int) -> List[int]:
+    """Jugadas legales de la pieza en 'src' (filtra generate_legal_moves)."""
+    return [m for m in generate_legal_moves(position, color) if m & 63 == src]
+
+
+def find_legal_move(position: BitboardPosition, color: str, src: int, dst: int,
+                    promo: int = QUEEN) -> Optional[int]:
+    """Jugada legal src->dst (con la promoción pedida si corresponde) o None."""
+    for m in generate_legal_moves(position, color):
+        if m & 63 == src and (m >> 6) & 63 == dst:
+            if m >> 12 in (0, promo):
+                return m
+    return None
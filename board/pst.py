@@ -0,0 +1,116 @@
+from typing import List
+
+# ---------------------------------------------------------------------
+# Tablas de evaluación por pieza y casilla (PST), material y fase.
+# Están en board/ porque BitboardPosition las suma en _put/_remove;
+# engine/evaluation.py las usa para interpolar.
+#
+# Las tablas están escritas desde el lado de las blancas con la fila 8
+# arriba (como se ve el tablero); las negras usan la tabla espejada y
+# restan. Las tablas de casillas (incluidas las dos del rey, medio juego
+# y final) son las de la "Simplified Evaluation Function" de Tomasz
+# Michniewski (chessprogramming.org). Los valores de material de medio
+# juego y de final son los de PeSTO (Ronald Friederich).
+# ---------------------------------------------------------------------
+
+# peón, caballo, alfil, torre, dama, rey
+MATERIAL_MG = (82, 337, 365, 477, 1025, 0)
+MATERIAL_EG = (94, 281, 297, 512, 936, 0)
+
+# Aporte de cada tipo a la fase (24 = todas las piezas, 0 = solo peones y reyes)
+PHASE_WEIGHTS = (0, 1, 1, 2, 4, 0)
+PHASE_MAX = 24
+
+_PAWN = (
+     0,  0,  0,  0,  0,  0,  0,  0,
+    50, 50, 50, 50, 50, 50, 50, 50,
+    10, 10, 20, 30, 30, 20, 10, 10,
+     5,  5, 10, 25, 25, 10,  5,  5,
+     0,  0,  0, 20, 20,  0,  0,  0,
+     5, -5,-10,  0,  0,-10, -5,  5,
+     5, 10, 10,-20,-20, 10, 10,  5,
+     0,  0,  0,  0,  0,  0,  0,  0,
+)
+_KNIGHT = (
+    -50,-40,-30,-30,-30,-30,-40,-50,
+    -40,-20,  0,  0,  0,  0,-20,-40,
+    -30,  0, 10, 15, 15, 10,  0,-30,
+    -30,  5, 15, 20, 20, 15,  5,-30,
+    -30,  0, 15, 20, 20, 15,  0,-30,
+    -30,  5, 10, 15, 15, 10,  5,-30,
+    -40,-20,  0,  5,  5,  0,-20,-40,
+    -50,-40,-30,-30,-30,-30,-40,-50,
+)
+_BISHOP = (
+    -20,-10,-10,-10,-10,-10,-10,-20,
+    -10,  0,  0,  0,  0,  0,  0,-10,
+    -10,  0,  5, 10, 10,  5,  0,-10,
+    -10,  5,  5, 10, 10,  5,  5,-10,
+    -10,  0, 10, 10, 10, 10,  0,-10,
+    -10, 10, 10, 10, 10, 10, 10,-10,
+    -10,  5,  0,  0,  0,  0,  5,-10,
+    -20,-10,-10,-10,-10,-10,-10,-20,
+)
+_ROOK = (
+     0,  0,  0,  0,  0,  0,  0,  0,
+     5, 10, 10, 10, 10, 10, 10,  5,
+    -5,  0,  0,  0,  0,  0,  0, -5,
+    -5,  0,  0,  0,  0,  0,  0, -5,
+    -5,  0,  0,  0,  0,  0,  0, -5,
+    -5,  0,  0,  0,  0,  0,  0, -5,
+    -5,  0,  0,  0,  0,  0,  0, -5,
+     0,  0,  0,  5,  5,  0,  0,  0,
+)
+_QUEEN = (
+    -20,-10,-10, -5, -5,-10,-10,-20,
+    -10,  0,  0,  0,  0,  0,  0,-10,
+    -10,  0,  5,  5,  5,  5,  0,-10,
+     -5,  0,  5,  5,  5,  5,  0, -5,
+      0,  0,  5,  5,  5,  5,  0, -5,
+    -10,  5,  5,  5,  5,  5,  0,-10,
+    -10,  0,  5,  0,  0,  0,  0,-10,
+    -20,-10,-10, -5, -5,-10,-10,-20,
+)
+_KING_MG = (
+    -30,-40,-40,-50,-50,-40,-40,-30,
+    -30,-40,-40,-50,-50,-40,-40,-30,
+    -30,-40,-40,-50,-50,-40,-40,-30,
+    -30,-40,-40,-50,-50,-40,-40,-30,
+    -20,-30,-30,-40,-40,-30,-30,-20,
+    -10,-20,-20,-20,-20,-20,-20,-10,
+     20, 20,  0,  0,  0,  0, 20, 20,
+     20, 30, 10,  0,  0, 10, 30, 20,
+)
+_KING_EG = (
+    -50,-40,-30,-20,-20,-30,-40,-50,
+    -30,-20,-10,  0,  0,-10,-20,-30,
+    -30,-10, 20, 30, 30, 20,-10,-30,
+    -30,-10, 30, 40, 40, 30,-10,-30,
+    -30,-10, 30, 40, 40, 30,-10,-30,
+    -30,-10, 20, 30, 30, 20,-10,-30,
+    -30,-30,  0,  0,  0,  0,-30,-30,
+    -50,-30,-30,-30,-30,-30,-30,-50,
+)
+
+_TABLES_MG = (_PAWN, _KNIGHT, _BISHOP, _ROOK, _QUEEN, _KING_MG)
+_TABLES_EG = (_PAWN, _KNIGHT, _BISHOP, _ROOK, _QUEEN, _KING_EG)
+
+
+def _build(material, tables) -> List[List[int]]:
+    """[código][casilla] -> material + PST, positivo para blancas y negativo para negras."""
+    res = []
+    for code in range(12):
+        kind = code % 6
+        row = []
+        for sq in range(64):
+            # a1 = 0; en la tabla la fila 8 va primero
+            visual = (7 - (sq >> 3)) * 8 + (sq & 7) if code < 6 else sq
+            value = material[kind] + tables[kind][visual]
+            row.append(value if code < 6 else -value)
+        res.append(row)
+    return res
+
+
+PST_MG = _build(MATERIAL_MG, _TABLES_MG)
+PST_EG = _build(MATERIAL_EG, _TABLES_EG)
+PHASE = [PHASE_WEIGHTS[code % 6] for code in range(12)]
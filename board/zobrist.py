@@ -0,0 +1,41 @@
+import random
+from typing import List
+
+# ---------------------------------------------------------------------
+# Claves Zobrist: un número aleatorio de 64 bits por (pieza, casilla),
+# por combinación de derechos de enroque, por columna de en passant y
+# para "mueven negras". La clave de una posición es el XOR de las que
+# correspondan. Semilla fija: las claves son iguales en cada ejecución
+# (necesario para libros de aperturas o tablas guardadas en disco).
+# ---------------------------------------------------------------------
+
+_rng = random.Random(0x5EED_C4E55)
+
+
+def _rand64() -> int:
+    return _rng.getrandbits(64)
+
+
+PIECE_KEYS: List[List[int]] = [[_rand64() for _ in range(64)] for _ in range(12)]
+CASTLING_KEYS: List[int] = [_rand64() for _ in range(16)]
+EP_FILE_KEYS: List[int] = [_rand64() for _ in range(8)]
+SIDE_KEY: int = _rand64()
+
+
+def state_key(turn: str, castling: int, ep_square) -> int:
+    """Parte de la clave que no depende de las piezas."""
+    key = CASTLING_KEYS[castling]
+    if ep_square is not None:
+        key ^= EP_FILE_KEYS[ep_square & 7]
+    if turn == "black":
+        key ^= SIDE_KEY
+    return key
+
+
+def compute_key(position) -> int:
+    """Clave completa calculada desde cero (para verificar la incremental)."""
+    key = 0
+    for sq, code in enumerate(position.mailbox):
+        if code is not None:
+            key ^= PIECE_KEYS[code][sq]
+    return key ^ state_key(position.turn, position.castling, position.ep_square)
@@ -0,0 +1,244 @@
+# batch_eval.py
+# ---------------------------------------------------------------------
+# Evaluación en lote con NumPy, para análisis de muchas posiciones (por
+# ejemplo todas las de un archivo de partidas). Misma escala que
+# engine/evaluation.py, pero sobre un array en vez de una posición:
+#
+#   codificación (N, 64) uint8: 0 = vacía, código de pieza + 1 (1..12)
+#   o (N, 12, 64) con un plano 0/1 por pieza (se convierte a la anterior)
+#
+# score_batch devuelve, desde el lado de las blancas:
+#   material  material interpolado por fase
+#   pst       parte posicional de las tablas de casillas (material + pst
+#             es exactamente evaluate() de engine/evaluation.py)
+#   mobility  aproximación de movilidad: casillas vacías que alcanza cada
+#             pieza con su patrón en tablero vacío (sin bloqueos), propias
+#             menos rivales, por MOBILITY_WEIGHT
+#   total     suma de las tres
+#
+# NumPy es opcional: el resto del repo no lo necesita y este módulo se
+# puede importar sin él (las funciones avisan al usarse).
+#
+# Uso (desde la raíz del repo):
+#   python -m engine.batch_eval [carpetas_o_archivos .chess/.chsa ...]
+# ---------------------------------------------------------------------
+
+import argparse
+import sys
+import time
+from typing import Dict, Iterable, List
+
+try:
+    import numpy as np
+except ImportError:  # opcional
+    np = None
+
+from board.attacks import KNIGHT_ATTACKS, KING_ATTACKS, bishop_attacks, rook_attacks, queen_attacks
+from board.bitboard import BitboardPosition, QUEEN, iter_bits
+from board.movegen import find_legal_move
+from board.pst import MATERIAL_MG, MATERIAL_EG, PST_MG, PST_EG, PHASE, PHASE_MAX
+from storage.archive import ArchiveError, GameArchive, read_chess_file
+from storage.chessfiles import collect_files
+
+MOBILITY_WEIGHT = 2
+
+# Filas por bloque (acota la memoria de los índices intermedios)
+CHUNK_ROWS = 65536
+
+
+def _require_numpy() -> None:
+    if np is None:
+        raise ImportError("engine/batch_eval.py necesita numpy (pip install numpy)")
+
+
+# ------------------------------ codificación --------------------------------
+
+def encode_position(position: BitboardPosition) -> bytes:
+    """Una posición como 64 bytes (0 = vacía, código + 1)."""
+    return bytes(0 if code is None else code + 1 for code in position.mailbox)
+
+
+def encode_positions(positions: Iterable[BitboardPosition]):
+    _require_numpy()
+    data = b"".join(encode_position(p) for p in positions)
+    return np.frombuffer(data, dtype=np.uint8).reshape(-1, 64).copy()
+
+
+def encode_boards(boards: Iterable):
+    """Board (board/board.py) -> (N, 64)."""
+    return encode_positions(b.bb for b in boards)
+
+
+def encode_history(moves: List[int]):
+    """
+    Todas las posiciones de una partida (la inicial y una por jugada),
+    reproduciendo las jugadas codificadas (storage/archive.py). Se corta
+    en la primera jugada ilegal.
+    """
+    _require_numpy()
+    pos = BitboardPosition.starting()
+    rows = [encode_position(pos)]
+    for mv in moves:
+        legal = find_legal_move(pos, pos.turn, mv & 63, (mv >> 6) & 63, (mv >> 12) or QUEEN)
+        if legal is None:
+            break
+        pos.make_move(legal)
+        rows.append(encode_position(pos))
+    return np.frombuffer(b"".join(rows), dtype=np.uint8).reshape(-1, 64).copy()
+
+
+def encode_chess_file(path: str):
+    """Posiciones de un .chess. ArchiveError si tiene una línea mal formada."""
+    return encode_history(read_chess_file(path, with_result=False).moves)
+
+
+def planes_to_codes(planes):
+    """(N, 12, 64) 0/1 -> (N, 64) con código + 1."""
+    _require_numpy()
+    planes = np.asarray(planes, dtype=np.uint8)
+    weights = np.arange(1, 13, dtype=np.uint8).reshape(1, 12, 1)
+    return (planes * weights).max(axis=1).astype(np.uint8)
+
+
+def codes_to_planes(codes):
+    _require_numpy()
+    codes = np.asarray(codes, dtype=np.uint8)
+    return (codes[:, None, :] == np.arange(1, 13, dtype=np.uint8).reshape(1, 12, 1)).astype(np.uint8)
+
+
+# -------------------------------- tablas ------------------------------------
+
+_tables = None
+
+
+def _build_tables():
+    """Tablas indexadas por código + 1 (la fila 0 es la casilla vacía)."""
+    global _tables
+    if _tables is not None:
+        return _tables
+
+    sign = np.array([0] + [1] * 6 + [-1] * 6, dtype=np.int64)
+    kinds = np.array([0] + list(range(6)) * 2)
+    mat_mg = sign * np.array(MATERIAL_MG)[kinds]
+    mat_eg = sign * np.array(MATERIAL_EG)[kinds]
+    mat_mg[0] = mat_eg[0] = 0
+
+    pst_mg = np.zeros((13, 64), dtype=np.int64)
+    pst_eg = np.zeros((13, 64), dtype=np.int64)
+    pst_mg[1:] = np.array(PST_MG) - mat_mg[1:, None]
+    pst_eg[1:] = np.array(PST_EG) - mat_eg[1:, None]
+    phase = np.array([0] + PHASE, dtype=np.int64)
+
+    # Patrones en tablero vacío por tipo (los peones no cuentan movilidad)
+    patterns = [
+        None,
+        KNIGHT_ATTACKS,
+        [bishop_attacks(sq, 0) for sq in range(64)],
+        [rook_attacks(sq, 0) for sq in range(64)],
+        [queen_attacks(sq, 0) for sq in range(64)],
+        KING_ATTACKS,
+    ]
+    reach = np.zeros((6, 64, 64), dtype=np.float32)
+    for kind, masks in enumerate(patterns):
+        if masks is None:
+            continue
+        for sq in range(64):
+            for t in iter_bits(masks[sq]):
+                reach[kind, sq, t] = 1
+
+    _tables = (mat_mg, mat_eg, pst_mg, pst_eg, phase, reach)
+    return _tables
+
+
+# ------------------------------- evaluación ---------------------------------
+
+def score_batch(positions) -> Dict[str, "np.ndarray"]:
+    """Términos de evaluación (int64, lado blanco) de N posiciones (N, 64) o (N, 12, 64)."""
+    _require_numpy()
+    codes = np.asarray(positions, dtype=np.uint8)
+    if codes.ndim == 3:
+        codes = planes_to_codes(codes)
+    if codes.ndim != 2 or codes.shape[1] != 64:
+        raise ValueError(f"Se esperaba (N, 64) o (N, 12, 64), no {codes.shape}")
+
+    n = codes.shape[0]
+    out = {name: np.zeros(n, dtype=np.int64) for name in ("material", "pst", "mobility", "total")}
+    for start in range(0, n, CHUNK_ROWS):
+        part = codes[start:start + CHUNK_ROWS]
+        for name, values in _score_chunk(part).items():
+            out[name][start:start + len(part)] = values
+    out["total"] = out["material"] + out["pst"] + out["mobility"]
+    return out
+
+
+def _score_chunk(codes) -> Dict[str, "np.ndarray"]:
+    mat_mg, mat_eg, pst_mg, pst_eg, phase_w, reach = _build_tables()
+    idx = codes.astype(np.intp)
+    squares = np.arange(64)
+
+    phase = np.minimum(phase_w[idx].sum(axis=1), PHASE_MAX)
+
+    def taper(mg, eg):
+        # división entera hacia -inf, como // en engine/evaluation.py
+        return (mg * phase + eg * (PHASE_MAX - phase)) // PHASE_MAX
+
+    mg_mat, eg_mat = mat_mg[idx].sum(axis=1), mat_eg[idx].sum(axis=1)
+    material = taper(mg_mat, eg_mat)
+    # pst = evaluación completa - material, así material + pst == evaluate() (lado blanco)
+    pst = taper(mg_mat + pst_mg[idx, squares].sum(axis=1),
+                eg_mat + pst_eg[idx, squares].sum(axis=1)) - material
+
+    # Movilidad: por tipo, (piezas blancas - negras) @ alcance, contando solo casillas vacías
+    empty = (codes == 0).astype(np.float32)
+    mobility = np.zeros(len(codes), dtype=np.float32)
+    for kind in range(1, 6):
+        own = (idx == kind + 1).astype(np.float32) - (idx == kind + 7).astype(np.float32)
+        if not own.any():
+            continue
+        mobility += ((own @ reach[kind]) * empty).sum(axis=1)
+    mobility = np.rint(mobility).astype(np.int64) * MOBILITY_WEIGHT
+
+    return {"material": material, "pst": pst, "mobility": mobility}
+
+
+# --------------------------------- CLI -------------------------------------
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Evaluación en lote de partidas")
+    parser.add_argument("targets", nargs="+", help=".chess, carpetas o archivos .chsa")
+    args = parser.parse_args()
+    try:
+        _require_numpy()
+    except ImportError as e:
+        print(f"[ERROR] {e}")
+        return 1
+
+    t0 = time.perf_counter()
+    batches = []
+    for target in args.targets:
+        if target.endswith(".chsa"):
+            with GameArchive(target) as arc:
+                batches += [encode_history(game.moves) for game in arc]
+        else:
+            for path in collect_files([target]):
+                try:
+                    batches.append(encode_chess_file(path))
+                except (OSError, UnicodeDecodeError, ArchiveError) as e:
+                    print(f"[WARN] Se omite {path}: {e}")
+    if not batches:
+        print("[INFO] No hay partidas.")
+        return 0
+    codes = np.concatenate(batches)
+    t1 = time.perf_counter()
+    scores = score_batch(codes)
+    t2 = time.perf_counter()
+    print(f"{len(batches)} partidas, {len(codes)} posiciones: "
+          f"codificación {t1 - t0:.2f}s, evaluación {t2 - t1:.2f}s "
+          f"({len(codes) / (t2 - t1) if t2 > t1 else 0:.0f} posiciones/s)")
+    for name in ("material", "pst", "mobility", "total"):
+        print(f"  {name:<9} media {scores[name].mean():>8.1f}  mín {scores[name].min():>6}  máx {scores[name].max():>6}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
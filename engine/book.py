@@ -0,0 +1,246 @@
+# book.py
+# ---------------------------------------------------------------------
+# Libro de aperturas: (clave Zobrist, jugada, peso) ordenados por clave en
+# un archivo que se lee con mmap. Buscar una posición es una búsqueda
+# binaria sobre los registros, sin cargar el archivo en memoria.
+#
+# Formato (little-endian):
+#   cabecera  "CHSB" | versión u16 | reservado u16 | cantidad u32
+#   registro  clave u64 | jugada u16 (board/movegen.py) | peso u16
+#
+# El libro se arma con partidas .chess (o archivos .chsa de
+# storage/archive.py): cada jugada de las primeras 'plies' medias
+# jugadas suma 1 al peso de (posición, jugada).
+#
+# best_move usa DEFAULT_BOOK_PATH (book.chsb en la raíz del repo), o el
+# que se elija con set_default_book().
+#
+# Uso (desde la raíz del repo):
+#   python -m engine.book build [carpetas_o_archivos ...] [--out book.chsb] [--plies N] [--min-count K]
+#   python -m engine.book probe ["FEN"] [--book book.chsb]
+# ---------------------------------------------------------------------
+
+import argparse
+import mmap
+import os
+import random
+import struct
+import sys
+import threading
+import time
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from board.bitboard import BitboardPosition, QUEEN, START_FEN
+from board.movegen import find_legal_move, generate_legal_moves, move_to_uci
+from storage.archive import ArchiveError, GameArchive, read_chess_file
+from storage.chessfiles import GAMES_DIR, collect_files
+
+BOOK_FILE = "book.chsb"
+# Libro que usa best_move: en la raíz del repo, no en el directorio de trabajo
+_REPO_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DEFAULT_BOOK_PATH = os.path.join(_REPO_DIR, BOOK_FILE)
+MAGIC = b"CHSB"
+VERSION = 1
+
+HEADER = struct.Struct("<4sHHI")
+RECORD = struct.Struct("<QHH")
+
+# Medias jugadas de cada partida que entran al libro
+BOOK_PLIES = 16
+MAX_WEIGHT = 0xFFFF
+
+
+class OpeningBook:
+    """Libro abierto con mmap. Se usa como contexto o se deja abierto (best_move)."""
+
+    def __init__(self, path: str):
+        self.path = path
+        self._file = open(path, "rb")
+        try:
+            self._mm = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:
+            self._file.close()
+            raise ValueError(f"{path}: libro vacío")
+        if len(self._mm) < HEADER.size:
+            self.close()
+            raise ValueError(f"{path}: cabecera incompleta")
+        magic, version, _, count = HEADER.unpack_from(self._mm, 0)
+        if magic != MAGIC or version != VERSION:
+            self.close()
+            raise ValueError(f"{path}: no es un libro de aperturas (v{VERSION})")
+        self.count = count
+
+    def __len__(self) -> int:
+        return self.count
+
+    def _key_at(self, i: int) -> int:
+        return struct.unpack_from("<Q", self._mm, HEADER.size + i * RECORD.size)[0]
+
+    def entries(self, key: int) -> List[Tuple[int, int]]:
+        """(jugada, peso) guardadas para la clave; búsqueda binaria del primer registro."""
+        lo, hi = 0, self.count
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if self._key_at(mid) < key:
+                lo = mid + 1
+            else:
+                hi = mid
+        res = []
+        offset = HEADER.size + lo * RECORD.size
+        while lo < self.count:
+            k, move, weight = RECORD.unpack_from(self._mm, offset)
+            if k != key:
+                break
+            res.append((move, weight))
+            lo += 1
+            offset += RECORD.size
+        return res
+
+    def choose(self, position: BitboardPosition, rng: Optional[random.Random] = None) -> Optional[int]:
+        """Jugada del libro para la posición (al azar según el peso), solo si es legal."""
+        entries = self.entries(position.key)
+        if not entries:
+            return None
+        legal = set(generate_legal_moves(position, position.turn))
+        entries = [(m, w) for m, w in entries if m in legal]
+        if not entries:
+            return None
+        rng = rng or random
+        pick = rng.randrange(sum(w for _, w in entries))
+        for move, weight in entries:
+            pick -= weight
+            if pick < 0:
+                return move
+        return entries[-1][0]
+
+    def close(self) -> None:
+        if getattr(self, "_mm", None) is not None:
+            self._mm.close()
+            self._mm = None
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+# Libro por defecto de best_move: se abre la primera vez que se pide. Lo
+# piden game.py y el hilo de análisis, así que la apertura va con lock.
+_default_path: Optional[str] = DEFAULT_BOOK_PATH
+_default_book: Optional[OpeningBook] = None
+_default_checked = False
+_default_lock = threading.Lock()
+
+
+def set_default_book(path: Optional[str]) -> None:
+    """Cambia el libro de best_move (None = sin libro). Se abre en el próximo pedido."""
+    global _default_path, _default_book, _default_checked
+    with _default_lock:
+        # el anterior no se cierra: otro hilo puede estar leyéndolo
+        _default_path, _default_book, _default_checked = path, None, False
+
+
+def default_book() -> Optional[OpeningBook]:
+    """El libro configurado si existe (None si no hay libro)."""
+    global _default_book, _default_checked
+    if _default_checked:
+        return _default_book
+    with _default_lock:
+        if not _default_checked:
+            if _default_path and os.path.isfile(_default_path):
+                try:
+                    _default_book = OpeningBook(_default_path)
+                except (OSError, ValueError) as e:
+                    print(f"[WARN] No se pudo abrir el libro {_default_path}: {e}")
+            _default_checked = True
+    return _default_book
+
+
+# ------------------------------ construcción --------------------------------
+
+def add_game(counts: Dict[Tuple[int, int], int], moves: List[int], plies: int) -> None:
+    pos = BitboardPosition.starting()
+    for mv in moves[:plies]:
+        legal = find_legal_move(pos, pos.turn, mv & 63, (mv >> 6) & 63, (mv >> 12) or QUEEN)
+        if legal is None:
+            return
+        entry = (pos.key, legal)
+        counts[entry] = counts.get(entry, 0) + 1
+        pos.make_move(legal)
+
+
+def write_book(path: str, counts: Dict[Tuple[int, int], int], min_count: int = 1) -> int:
+    records = sorted((key, move, min(n, MAX_WEIGHT))
+                     for (key, move), n in counts.items() if n >= min_count)
+    tmp = path + ".tmp"
+    with open(tmp, "wb") as f:
+        f.write(HEADER.pack(MAGIC, VERSION, 0, len(records)))
+        f.writelines(RECORD.pack(*r) for r in records)
+    os.replace(tmp, path)
+    return len(records)
+
+
+def build_book(targets: Iterable[str], out_path: str, plies: int = BOOK_PLIES,
+               min_count: int = 1) -> Tuple[int, int]:
+    """Arma el libro desde .chess/.chsa. Devuelve (partidas, registros)."""
+    counts: Dict[Tuple[int, int], int] = {}
+    games = 0
+    for target in targets:
+        if target.endswith(".chsa"):
+            with GameArchive(target) as arc:
+                for i in range(len(arc)):
+                    add_game(counts, arc.moves(i), plies)
+                    games += 1
+            continue
+        for path in collect_files([target]):
+            try:
+                add_game(counts, read_chess_file(path, with_result=False).moves, plies)
+                games += 1
+            except (OSError, UnicodeDecodeError, ArchiveError) as e:
+                print(f"[WARN] Se omite {path}: {e}")
+    return games, write_book(out_path, counts, min_count)
+
+
+# --------------------------------- CLI -------------------------------------
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Libro de aperturas")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    bd = sub.add_parser("build", help="armar el libro desde partidas")
+    bd.add_argument("targets", nargs="*", default=[GAMES_DIR])
+    bd.add_argument("--out", default=DEFAULT_BOOK_PATH)
+    bd.add_argument("--plies", type=int, default=BOOK_PLIES)
+    bd.add_argument("--min-count", type=int, default=1,
+                    help="veces mínimas que tiene que aparecer una jugada")
+
+    pr = sub.add_parser("probe", help="jugadas del libro para una posición")
+    pr.add_argument("fen", nargs="?", default=START_FEN)
+    pr.add_argument("--book", default=DEFAULT_BOOK_PATH)
+
+    args = parser.parse_args()
+    try:
+        if args.command == "build":
+            t0 = time.perf_counter()
+            games, records = build_book(args.targets, args.out, args.plies, args.min_count)
+            print(f"{games} partidas -> {records} registros en {args.out} "
+                  f"({time.perf_counter() - t0:.2f}s)")
+        else:
+            with OpeningBook(args.book) as book:
+                pos = BitboardPosition.from_fen(args.fen)
+                entries = book.entries(pos.key)
+                total = sum(w for _, w in entries)
+                for move, weight in sorted(entries, key=lambda e: -e[1]):
+                    print(f"{move_to_uci(move):<6} {weight:>6}  {100 * weight / total:5.1f}%")
+                if not entries:
+                    print("(posición fuera del libro)")
+    except (OSError, ValueError, ArchiveError) as e:
+        print(f"[ERROR] {e}")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
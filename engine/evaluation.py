@@ -0,0 +1,29 @@
+from board.pst import PST_MG, PST_EG, PHASE, PHASE_MAX
+
+# ---------------------------------------------------------------------
+# Evaluación: material + tablas de casillas (PST) de medio juego y de
+# final, interpoladas según la fase (cuánto material menor/mayor queda).
+#
+# No recorre el tablero: BitboardPosition mantiene mg, eg y phase
+# sumando/restando en _put/_remove (como la clave Zobrist), así que cada
+# jugada cuesta O(1) y evaluate() solo hace la interpolación. Las tablas
+# están en board/pst.py.
+# ---------------------------------------------------------------------
+
+
+def evaluate(position) -> int:
+    """Evaluación interpolada, desde el punto de vista del bando que mueve."""
+    phase = min(position.phase, PHASE_MAX)
+    score = (position.mg * phase + position.eg * (PHASE_MAX - phase)) // PHASE_MAX
+    return score if position.turn == "white" else -score
+
+
+def compute_terms(position):
+    """(mg, eg, phase) recorriendo las piezas; para verificar la versión incremental."""
+    mg = eg = phase = 0
+    for sq, code in enumerate(position.mailbox):
+        if code is not None:
+            mg += PST_MG[code][sq]
+            eg += PST_EG[code][sq]
+            phase += PHASE[code]
+    return mg, eg, phase
@@ -0,0 +1,89 @@
+from typing import List
+
+from board.bitboard import BitboardPosition, PAWN
+
+# ---------------------------------------------------------------------
+# Orden de jugadas para la búsqueda alfa-beta: cuanto antes se prueba la
+# jugada que corta, menos nodos se visitan. Orden:
+#   1. jugada de la tabla de transposición
+#   2. capturas y promociones por MVV-LVA (víctima más valiosa primero,
+#      a igualdad el atacante más barato)
+#   3. killers: jugadas tranquilas que cortaron en la misma profundidad
+#   4. el resto por la tabla de historia (cortes acumulados por pieza y
+#      casilla de destino)
+# ---------------------------------------------------------------------
+
+# Valores para MVV-LVA (solo importa el orden); el rey como víctima no aparece
+MVV_LVA_VALUES = (1, 3, 3, 5, 9, 20)
+
+TT_SCORE = 1 << 30
+CAPTURE_SCORE = 1 << 20
+KILLER_SCORES = (1 << 19, (1 << 19) - 1)
+
+# Tope de la historia (se reduce a la mitad al pasarlo y en cada búsqueda)
+HISTORY_MAX = 1 << 18
+
+MAX_PLY = 128
+
+
+def is_capture(position: BitboardPosition, move: int) -> bool:
+    dst = (move >> 6) & 63
+    if position.mailbox[dst] is not None:
+        return True
+    # en passant: peón que llega a la casilla de paso
+    return dst == position.ep_square and position.mailbox[move & 63] % 6 == PAWN
+
+
+class MoveOrderer:
+    def __init__(self):
+        self.killers = [[0, 0] for _ in range(MAX_PLY)]
+        # historia[código de pieza][destino]
+        self.history = [[0] * 64 for _ in range(12)]
+
+    def new_search(self) -> None:
+        """Entre jugadas: se olvidan los killers y la historia pierde peso."""
+        for slot in self.killers:
+            slot[0] = slot[1] = 0
+        for row in self.history:
+            for sq in range(64):
+                row[sq] >>= 1
+
+    def score(self, position: BitboardPosition, move: int, ply: int, tt_move: int = 0) -> int:
+        if move == tt_move:
+            return TT_SCORE
+        mailbox = position.mailbox
+        src, dst, promo = move & 63, (move >> 6) & 63, move >> 12
+        attacker = mailbox[src]
+        victim = mailbox[dst]
+        if victim is not None or promo or (dst == position.ep_square and attacker % 6 == PAWN):
+            gain = MVV_LVA_VALUES[victim % 6] if victim is not None else MVV_LVA_VALUES[PAWN]
+            if promo:
+                gain += MVV_LVA_VALUES[promo] - MVV_LVA_VALUES[PAWN]
+            return CAPTURE_SCORE + gain * 64 - MVV_LVA_VALUES[attacker % 6]
+        if ply < MAX_PLY:
+            killers = self.killers[ply]
+            if move == killers[0]:
+                return KILLER_SCORES[0]
+            if move == killers[1]:
+                return KILLER_SCORES[1]
+        return self.history[attacker][dst]
+
+    def order(self, position: BitboardPosition, moves: List[int], ply: int,
+              tt_move: int = 0) -> List[int]:
+        return sorted(moves, key=lambda m: self.score(position, m, ply, tt_move), reverse=True)
+
+    def record_cutoff(self, position: BitboardPosition, move: int, depth: int, ply: int) -> None:
+        """La jugada produjo un corte beta. 'position' es la de antes de jugarla."""
+        if is_capture(position, move) or move >> 12:
+            return  # las capturas ya van primero por MVV-LVA
+        if ply < MAX_PLY:
+            killers = self.killers[ply]
+            if killers[0] != move:
+                killers[1], killers[0] = killers[0], move
+        row = self.history[position.mailbox[move & 63]]
+        dst = (move >> 6) & 63
+        row[dst] += depth * depth
+        if row[dst] > HISTORY_MAX:
+            for hist_row in self.history:
+                for sq in range(64):
+                    hist_row[sq] >>= 1
@@ -0,0 +1,254 @@
+import sys
+import threading
+import time
+from typing import List, Optional
+
+from board.bitboard import BitboardPosition, COLOR_INDEX, QUEEN, square_index
+from board.movegen import generate_legal_moves, in_check
+from engine.book import default_book
+from engine.evaluation import evaluate
+from engine.ordering import MoveOrderer, is_capture
+from engine.see import see
+from engine.transposition import (
+    TranspositionTable, EXACT, LOWER, UPPER, score_to_tt, score_from_tt,
+)
+
+# ---------------------------------------------------------------------
+# Motor de búsqueda: negamax con poda alfa-beta y profundización
+# iterativa. Trabaja sobre BitboardPosition con make/unmake, así que no
+# copia posiciones dentro del árbol.
+#
+# Límites (cualquiera corta la búsqueda):
+#   - max_depth:  profundidad máxima en medias jugadas
+#   - max_nodes:  presupuesto de nodos
+#   - time_limit: segundos por jugada
+#   - stop:       threading.Event que otro hilo puede activar (cancelar)
+# Si se corta a mitad de una iteración se devuelve la mejor jugada de la
+# última iteración completa.
+#
+# La tabla de transposición (engine/transposition.py) se comparte entre
+# iteraciones y, si se pasa la misma, entre búsquedas. Las repeticiones
+# se detectan con las claves Zobrist guardadas en la pila de deshacer.
+# El orden de las jugadas (tabla, MVV-LVA, killers, historia) está en
+# engine/ordering.py y la evaluación (material + PST, incremental) en
+# engine/evaluation.py.
+#
+# En las hojas sigue una búsqueda de quietud: solo capturas (y
+# promociones a dama), con "stand pat" y sin las capturas que pierden
+# material según el SEE (engine/see.py), para no evaluar a mitad de un
+# intercambio. En jaque se prueban todas las evasiones, pero solo en las
+# primeras QS_CHECK_PLIES medias jugadas de la quietud: más abajo se
+# vuelve a evaluar, para que una cadena de jaques no la haga infinita.
+# ---------------------------------------------------------------------
+
+MATE = 100_000
+INF = MATE + 1
+
+# Cada cuántos nodos se miran el reloj y el evento de cancelación
+# (el presupuesto de nodos se compara en cada nodo)
+CHECK_EVERY = 1024
+
+# Medias jugadas de quietud en las que un jaque se responde con todas las evasiones
+QS_CHECK_PLIES = 4
+
+# Tamaño por defecto de la tabla de transposición
+TT_SIZE_MB = 16
+
+# Tabla compartida por best_move (se conserva entre jugadas de una partida)
+_shared_tt: Optional[TranspositionTable] = None
+
+
+class SearchAborted(Exception):
+    """Se agotó el tiempo o el presupuesto de nodos, o se pidió parar."""
+
+
+class Searcher:
+    def __init__(self, max_depth: int = 64, max_nodes: Optional[int] = None,
+                 time_limit: Optional[float] = None, tt: Optional[TranspositionTable] = None,
+                 stop: Optional[threading.Event] = None):
+        self.max_depth = max_depth
+        self.max_nodes = max_nodes
+        self.time_limit = time_limit
+        self.stop = stop
+        self.ordering = MoveOrderer()
+        self.tt = tt if tt is not None else TranspositionTable(TT_SIZE_MB)
+        self.nodes = 0
+        self.depth_reached = 0
+        self.best_score = 0
+        self._deadline: Optional[float] = None
+        self._node_limit = sys.maxsize
+
+    # ------------------------------ raíz ------------------------------------
+
+    def search(self, position: BitboardPosition,
+               root_moves: Optional[List[int]] = None) -> Optional[int]:
+        """
+        Mejor jugada para position.turn (None si no hay jugadas legales).
+        'root_moves' limita las jugadas de la raíz (por defecto, todas las legales).
+        """
+        self.nodes = 0
+        self.depth_reached = 0
+        self._deadline = time.perf_counter() + self.time_limit if self.time_limit else None
+        self._node_limit = self.max_nodes if self.max_nodes is not None else sys.maxsize
+        self.tt.new_search()
+        self.ordering.new_search()
+
+        if root_moves is None:
+            root_moves = generate_legal_moves(position, position.turn)
+        if not root_moves:
+            return None
+        entry = self.tt.probe(position.key)
+        root_moves = self.ordering.order(position, root_moves, 0, entry[0] if entry else 0)
+        best = root_moves[0]
+        if len(root_moves) == 1:
+            return best
+
+        for depth in range(1, self.max_depth + 1):
+            try:
+                score, move = self._root(position, root_moves, depth)
+            except SearchAborted:
+                break
+            best, self.best_score, self.depth_reached = move, score, depth
+            # La mejor jugada de esta iteración se prueba primero en la siguiente
+            root_moves.remove(move)
+            root_moves.insert(0, move)
+            if abs(score) >= MATE - self.max_depth:
+                break
+        return best
+
+    def _root(self, position: BitboardPosition, moves: List[int], depth: int):
+        alpha, beta = -INF, INF
+        best_move = moves[0]
+        for move in moves:
+            position.make_move(move)
+            try:
+                score = -self._negamax(position, depth - 1, -beta, -alpha, 1)
+            finally:
+                position.unmake_move()
+            if score > alpha:
+                alpha, best_move = score, move
+        self.tt.store(position.key, best_move, depth, EXACT, alpha)
+        return alpha, best_move
+
+    # ------------------------------ árbol -----------------------------------
+
+    def _negamax(self, position: BitboardPosition, depth: int, alpha: int, beta: int, ply: int) -> int:
+        self.nodes += 1
+        if self.nodes >= self._node_limit:
+            raise SearchAborted()
+        if self.nodes % CHECK_EVERY == 0:
+            self._check_limits()
+
+        # Tablas por repetición o regla de las 50 jugadas
+        if position.halfmove >= 100 or position.is_repetition():
+            return 0
+
+        key = position.key
+        entry = self.tt.probe(key)
+        tt_move = 0
+        if entry is not None:
+            tt_move, tt_depth, flag, tt_score = entry
+            if tt_depth >= depth:
+                tt_score = score_from_tt(tt_score, ply)
+                if (flag == EXACT or (flag == LOWER and tt_score >= beta)
+                        or (flag == UPPER and tt_score <= alpha)):
+                    return tt_score
+
+        if depth <= 0:
+            return self._quiesce(position, alpha, beta, ply)
+        moves = generate_legal_moves(position, position.turn)
+        if not moves:
+            return -MATE + ply if in_check(position, position.turn) else 0
+
+        alpha_orig = alpha
+        best_score, best = -INF, 0
+        for move in self.ordering.order(position, moves, ply, tt_move):
+            position.make_move(move)
+            try:
+                score = -self._negamax(position, depth - 1, -beta, -alpha, ply + 1)
+            finally:
+                position.unmake_move()
+            if score > best_score:
+                best_score, best = score, move
+            if score >= beta:
+                self.ordering.record_cutoff(position, move, depth, ply)
+                self.tt.store(key, move, depth, LOWER, score_to_tt(score, ply))
+                return score
+            if score > alpha:
+                alpha = score
+        flag = EXACT if alpha > alpha_orig else UPPER
+        self.tt.store(key, best if flag == EXACT else 0, depth, flag, score_to_tt(alpha, ply))
+        return alpha
+
+    def _quiesce(self, position: BitboardPosition, alpha: int, beta: int, ply: int,
+                 qply: int = 0) -> int:
+        self.nodes += 1
+        if self.nodes >= self._node_limit:
+            raise SearchAborted()
+        if self.nodes % CHECK_EVERY == 0:
+            self._check_limits()
+
+        moves = generate_legal_moves(position, position.turn)
+        checked = in_check(position, position.turn)
+        if checked and not moves:
+            return -MATE + ply
+        # En jaque no hay stand pat: se prueban todas las evasiones (pasado
+        # QS_CHECK_PLIES se evalúa como si no hubiera jaque)
+        evasions = checked and qply < QS_CHECK_PLIES
+        if not evasions:
+            stand_pat = evaluate(position)
+            if stand_pat >= beta:
+                return stand_pat
+            if stand_pat > alpha:
+                alpha = stand_pat
+            moves = [m for m in moves
+                     if (is_capture(position, m) or m >> 12 == QUEEN) and m >> 12 in (0, QUEEN)]
+
+        for move in self.ordering.order(position, moves, ply):
+            if not evasions and see(position, move) < 0:
+                continue  # pierde material aunque recapturen bien
+            position.make_move(move)
+            try:
+                score = -self._quiesce(position, -beta, -alpha, ply + 1, qply + 1)
+            finally:
+                position.unmake_move()
+            if score >= beta:
+                return score
+            if score > alpha:
+                alpha = score
+        return alpha
+
+    def _check_limits(self) -> None:
+        if self.stop is not None and self.stop.is_set():
+            raise SearchAborted()
+        if self._deadline is not None and time.perf_counter() >= self._deadline:
+            raise SearchAborted()
+
+
+def best_move(board, color: str, ep_target=None, max_depth: int = 64,
+              max_nodes: Optional[int] = None, time_limit: Optional[float] = None,
+              stop: Optional[threading.Event] = None, use_book: bool = True) -> Optional[int]:
+    """
+    Mejor jugada (codificada, ver board/movegen.py) para 'color' en un Board.
+    Busca sobre una copia de board.bb, así que el tablero no se toca.
+    Si hay libro de aperturas (engine/book.py) y la posición está, responde
+    con la jugada del libro sin buscar.
+    La interfaz solo corona dama (apply_move_sq), así que en la raíz no se
+    ofrecen subpromociones; dentro del árbol se siguen buscando todas.
+    """
+    if color not in COLOR_INDEX:
+        raise ValueError(f"Color inválido: {color}")
+    global _shared_tt
+    if _shared_tt is None:
+        _shared_tt = TranspositionTable(TT_SIZE_MB)
+    pos = board.bb.copy()
+    # La pila de deshacer se conserva: sus claves sirven para ver repeticiones
+    pos.turn = color
+    pos.ep_square = square_index(ep_target.col, ep_target.row) if ep_target else None
+    book = default_book() if use_book else None
+    if book is not None:
+        move = book.choose(pos)
+        if move is not None and move >> 12 in (0, QUEEN):
+            return move
+    root_moves = [m for m in generate_legal_moves(pos, pos.turn) if m >> 12 in (0, QUEEN)]
+    return Searcher(max_depth, max_nodes, time_limit, _shared_tt, stop).search(pos, root_moves)
@@ -0,0 +1,63 @@
+from board.attacks import attackers_to
+from board.bitboard import BitboardPosition, PAWN, KING
+
+# ---------------------------------------------------------------------
+# Intercambio estático (SEE): cuánto material gana o pierde una captura
+# si después ambos bandos recapturan en esa casilla, siempre con la pieza
+# más barata y pudiendo dejar de recapturar cuando no conviene.
+#
+# Usa attackers_to de board/attacks.py con una ocupación que se va
+# vaciando: al sacar una pieza aparecen las que estaban detrás (rayos X).
+# No mira clavadas ni jaques; es una estimación para podar, no una
+# búsqueda.
+# ---------------------------------------------------------------------
+
+# El rey vale "infinito": capturarlo nunca es una recaptura posible
+SEE_VALUES = (100, 320, 330, 500, 900, 20_000)
+
+
+def see(position: BitboardPosition, move: int) -> int:
+    """Balance material de la captura 'move' para el bando que la hace."""
+    src, dst, promo = move & 63, (move >> 6) & 63, move >> 12
+    mailbox = position.mailbox
+    pieces = position.pieces
+    attacker = mailbox[src]
+    us = attacker // 6
+    occupied = position.occupied ^ (1 << src)
+
+    victim = mailbox[dst]
+    if victim is not None:
+        gain = SEE_VALUES[victim % 6]
+    elif attacker % 6 == PAWN and dst == position.ep_square:
+        gain = SEE_VALUES[PAWN]
+        occupied ^= 1 << (dst - 8 if us == 0 else dst + 8)
+    else:
+        gain = 0
+    on_square = SEE_VALUES[attacker % 6]
+    if promo:
+        gain += SEE_VALUES[promo] - SEE_VALUES[PAWN]
+        on_square = SEE_VALUES[promo]
+
+    gains = [gain]
+    side = 1 - us
+    while True:
+        attackers = attackers_to(pieces, occupied, dst, side)
+        if not attackers:
+            break
+        base = side * 6
+        for kind in range(6):
+            candidates = attackers & pieces[base + kind]
+            if candidates:
+                break
+        # el rey solo recaptura si la casilla ya no está defendida
+        if kind == KING and attackers_to(pieces, occupied, dst, 1 - side):
+            break
+        gains.append(on_square - gains[-1])
+        on_square = SEE_VALUES[kind]
+        occupied ^= candidates & -candidates
+        side = 1 - side
+
+    # De atrás hacia adelante: cada bando elige entre recapturar o no
+    for i in range(len(gains) - 1, 0, -1):
+        gains[i - 1] = -max(-gains[i - 1], gains[i])
+    return gains[0]
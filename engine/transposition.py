@@ -0,0 +1,110 @@
+from array import array
+from typing import Optional, Tuple
+
+# ---------------------------------------------------------------------
+# Tabla de transposición de tamaño fijo.
+#
+# Cada bucket tiene dos entradas:
+#   - 0: preferencia por profundidad (solo se pisa con una búsqueda igual
+#        o más profunda, o si quedó de una búsqueda anterior)
+#   - 1: se reemplaza siempre
+# Las entradas se guardan en dos array('Q'): la clave completa y los datos
+# empaquetados en 64 bits, así el tope en MB es real (16 bytes por entrada)
+# y no depende del tamaño de los objetos de Python.
+#
+# Datos: jugada (16 bits) | profundidad (8) | tipo (2) | generación (8) | valor (30)
+# ---------------------------------------------------------------------
+
+EXACT, LOWER, UPPER = 0, 1, 2   # valor exacto, cota inferior (corte beta), cota superior
+
+ENTRY_BYTES = 16
+SLOTS = 2
+
+_SCORE_OFFSET = 1 << 29
+_MATE_BOUND = 90_000            # valores por encima de esto son "mate en n"
+
+
+def score_to_tt(score: int, ply: int) -> int:
+    # Los mates se guardan relativos al nodo, no a la raíz
+    if score >= _MATE_BOUND:
+        return score + ply
+    if score <= -_MATE_BOUND:
+        return score - ply
+    return score
+
+
+def score_from_tt(score: int, ply: int) -> int:
+    if score >= _MATE_BOUND:
+        return score - ply
+    if score <= -_MATE_BOUND:
+        return score + ply
+    return score
+
+
+class TranspositionTable:
+    def __init__(self, size_mb: float = 16):
+        if size_mb <= 0:
+            raise ValueError(f"Tamaño inválido: {size_mb} MB")
+        buckets = 1
+        # Potencia de dos más grande que entra en el tope
+        while buckets * 2 * SLOTS * ENTRY_BYTES <= size_mb * 1024 * 1024:
+            buckets *= 2
+        self.size_mb = size_mb
+        self._mask = buckets - 1
+        self._keys = array("Q", bytes(8 * buckets * SLOTS))
+        self._data = array("Q", bytes(8 * buckets * SLOTS))
+        self.generation = 0
+        self.hits = 0
+        self.probes = 0
+
+    def __len__(self) -> int:
+        return len(self._keys)
+
+    def clear(self) -> None:
+        n = len(self._keys)
+        self._keys = array("Q", bytes(8 * n))
+        self._data = array("Q", bytes(8 * n))
+        self.generation = 0
+
+    def new_search(self) -> None:
+        """Marca el comienzo de una búsqueda: lo anterior pasa a ser reemplazable."""
+        self.generation = (self.generation + 1) & 0xFF
+
+    # ------------------------------ acceso ----------------------------------
+
+    def probe(self, key: int) -> Optional[Tuple[int, int, int, int]]:
+        """(jugada, profundidad, tipo, valor) o None si la posición no está."""
+        self.probes += 1
+        i = (key & self._mask) * SLOTS
+        keys = self._keys
+        for slot in (i, i + 1):
+            if keys[slot] == key:
+                data = self._data[slot]
+                if data == 0:
+                    continue
+                self.hits += 1
+                return (data & 0xFFFF, (data >> 16) & 0xFF, (data >> 24) & 3,
+                        (data >> 34) - _SCORE_OFFSET)
+        return None
+
+    def store(self, key: int, move: int, depth: int, flag: int, score: int) -> None:
+        i = (key & self._mask) * SLOTS
+        keys, data = self._keys, self._data
+        old = data[i]
+        if (keys[i] == key or old == 0 or depth >= (old >> 16) & 0xFF
+                or (old >> 26) & 0xFF != self.generation):
+            slot = i
+            if keys[i] == key and move == 0:
+                move = old & 0xFFFF   # conservar la jugada conocida
+        else:
+            slot = i + 1
+        keys[slot] = key
+        data[slot] = (move | (max(depth, 0) << 16) | (flag << 24) | (self.generation << 26)
+                      | ((score + _SCORE_OFFSET) << 34))
+
+    def usage(self) -> float:
+        """Fracción de entradas ocupadas por la búsqueda actual (muestra de 1000)."""
+        sample = min(1000, len(self._data))
+        gen = self.generation
+        used = sum(1 for d in self._data[:sample] if d and (d >> 26) & 0xFF == gen)
+        return used / sample
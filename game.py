@@ -6,9 +6,11 @@
 #  - Enroque
 #  - En passant
 #  - Menú principal
+#  - Partida contra la IA (engine/search.py)
 #  - Menú de carga
 #  - Guardar partida (.chess) en formato UCI
 #  - Barra lateral con botones (guardar, menú, tablas, rendición)
+#  - Deshacer jugada (tecla Retroceso)
 #  - Popups con overlay oscuro (tablas, rendición, fin de partida)
 #  - Detección de jaque mate y ahogado
 # ---------------------------------------------------------------------
@@ -17,11 +19,17 @@ import os
 import sys
 import pygame
 from typing import List, Optional, Tuple
-from datetime import datetime
 
+from analysis import AnalysisService, ANALYSIS_EVENT
+from atlas import SpriteAtlas, atlas_for, load_scaled
 from board.board import Board
-from board.coordenates import Coordenate
-from pieces.queen import Queen  # para promover peones
+from storage.archive import RESULT_NAMES
+from storage.index import GameIndex, IndexEntry
+from board.coordenates import Coordenate, to_square
+from rules import (
+    GAMES_DIR, undo_last_move, legal_move_map, apply_move_sq, sq_to_alg,
+    save_game, load_game_from_file,
+)
 
 # ---------- constantes ----------
 TILE_SIZE = 64
@@ -41,16 +49,21 @@ MOVE_COLOR  = (80, 160, 120, 120)
 
 SIDEBAR_BG = (40, 40, 40)
 
-NAME_TO_SPRITEBASE = {
-    "pawn":   "pawn",
-    "rook":   "rook",
-    "bishop": "bishop",
-    "queen":  "queen",
-    "king":   "king",
-    "knight": "knight"
-}
+# Eventos tras los que la ventana vuelve a verse (destapada, restaurada):
+# sin compositor su contenido se perdió y hay que redibujar todo.
+# WINDOWEXPOSED / WINDOWRESTORED solo existen en pygame 2.
+EXPOSE_EVENTS = tuple(
+    getattr(pygame, name)
+    for name in ("VIDEOEXPOSE", "WINDOWEXPOSED", "WINDOWRESTORED")
+    if hasattr(pygame, name)
+)
 
-GAMES_DIR = "games"
+# Partidas por página en el menú de carga
+LOAD_PAGE_SIZE = 5
+
+# Modo contra la IA: color del motor y segundos de búsqueda por jugada
+ENGINE_COLOR = "black"
+ENGINE_TIME = 2.0
 
 
 # ---------- helpers básicos ----------
@@ -74,27 +87,11 @@ def mouse_to_indices(mx: int, my: int) -> Optional[Tuple[int, int]]:
 
 
 # ---------- carga de imágenes ----------
-def load_sprites(tile_size: int) -> dict:
-    sprites = {}
-    base_dir = os.path.join(os.path.dirname(__file__), "sprites")
-    for piece_name, base in NAME_TO_SPRITEBASE.items():
-        for color in ("white", "black"):
-            filename = f"{base}_{color}.png"
-            path = os.path.join(base_dir, filename)
-            try:
-                img = pygame.image.load(path).convert_alpha()
-                img = pygame.transform.smoothscale(img, (tile_size, tile_size))
-                sprites[(piece_name, color)] = img
-            except Exception as e:
-                print(f"[WARN] No se pudo cargar sprite {filename}: {e}")
-                surf = pygame.Surface((tile_size, tile_size), pygame.SRCALPHA)
-                pygame.draw.circle(
-                    surf, (220, 50, 50),
-                    (tile_size//2, tile_size//2),
-                    tile_size//3
-                )
-                sprites[(piece_name, color)] = surf
-    return sprites
+# Todo pasa por atlas.py: piezas e iconos salen de un único atlas cacheado
+# en disco por tamaño y los fondos de su versión ya escalada.
+def load_sprites(tile_size: int) -> SpriteAtlas:
+    # No decodifica nada todavía: el atlas se carga al pedir el primer sprite
+    return atlas_for(tile_size)
 
 
 def load_board_background(width: int, height: int):
@@ -105,10 +102,9 @@ def load_board_background(width: int, height: int):
     ]
     for path in candidates:
         try:
-            img = pygame.image.load(path).convert_alpha()
-            if img.get_width() != width or img.get_height() != height:
-                img = pygame.transform.smoothscale(img, (width, height))
-            return img
+            img = load_scaled(path, (width, height))
+            if img:
+                return img
         except:
             pass
     print("[INFO] No se encontró board.png, usando casillas de colores.")
@@ -119,8 +115,9 @@ def load_background_image():
     root = os.path.dirname(__file__)
     path = os.path.join(root, "sprites", "background.png")
     try:
-        img = pygame.image.load(path).convert()
-        img = pygame.transform.smoothscale(img, (WINDOW_W, WINDOW_H))
+        img = load_scaled(path, (WINDOW_W, WINDOW_H), alpha=False)
+        if img is None:
+            raise FileNotFoundError(path)
         return img
     except Exception as e:
         print(f"[INFO] No se pudo cargar background.png: {e}")
@@ -128,15 +125,10 @@ def load_background_image():
 
 
 def load_icon(name: str, size: int):
-    root = os.path.dirname(__file__)
-    path = os.path.join(root, "sprites", name)
-    try:
-        img = pygame.image.load(path).convert_alpha()
-        img = pygame.transform.smoothscale(img, (size, size))
-        return img
-    except Exception as e:
-        print(f"[WARN] No se pudo cargar icono {name}: {e}")
-        return None
+    icon = atlas_for(TILE_SIZE, size).icon(name)
+    if icon is None:
+        print(f"[WARN] No se pudo cargar icono {name}")
+    return icon
 
 
 # ---------- dibujo del tablero ----------
@@ -163,19 +155,94 @@ def draw_pieces(surface, board: Board, sprites):
                 continue
             x = c * TILE_SIZE
             y = (7 - r) * TILE_SIZE
-            name = getattr(p, "name", getattr(p, "type", None))
-            color = getattr(p, "color", None)
-            img = sprites.get((name, color))
+            img = sprites.get((p.name, p.color))
             if img:
                 surface.blit(img, (x, y))
 
 
+def square_rect(r_idx: int, c_idx: int) -> pygame.Rect:
+    return pygame.Rect(c_idx * TILE_SIZE, (7 - r_idx) * TILE_SIZE, TILE_SIZE, TILE_SIZE)
+
+
+def square_views(board: Board, sel_sq: Optional[int], legal: List[int],
+                 hover_sq: Optional[Tuple[int, int]]) -> List[tuple]:
+    """Lo que se ve en cada casilla (pieza, resaltada, hover); si no cambia, no se redibuja."""
+    marked = set(legal) if sel_sq is not None else set()
+    if sel_sq is not None:
+        marked.add(sel_sq)
+    hover = hover_sq[0] * 8 + hover_sq[1] if hover_sq else None
+    mailbox = board.bb.mailbox
+    return [(mailbox[sq], sq in marked, sq == hover) for sq in range(64)]
+
+
+def draw_square(surface, board_bg, board: Board, sprites, sq: int,
+                highlight: "HighlightLayer", hovered: bool) -> pygame.Rect:
+    """Redibuja una sola casilla (fondo, pieza y resaltados) y devuelve su rect."""
+    r, c = sq >> 3, sq & 7
+    rect = square_rect(r, c)
+    if board_bg:
+        surface.blit(board_bg, rect.topleft, rect)
+    else:
+        pygame.draw.rect(surface, DARK_SQ if (r + c) % 2 else LIGHT_SQ, rect)
+    p = board.board[r][c]
+    if p:
+        img = sprites.get((p.name, p.color))
+        if img:
+            surface.blit(img, rect.topleft)
+    surface.blit(highlight.surface, rect.topleft, rect)
+    if hovered:
+        draw_overlay_square(surface, r, c, HOVER_COLOR)
+    return rect
+
+
+# ---------- superficies translúcidas ----------
+# Una sola superficie por (tamaño, color RGBA): se crean la primera vez y
+# se reutilizan en todos los frames.
+_overlay_cache = {}
+
+
+def overlay_surface(size: Tuple[int, int], rgba) -> pygame.Surface:
+    key = (size, tuple(rgba))
+    surf = _overlay_cache.get(key)
+    if surf is None:
+        surf = pygame.Surface(size, pygame.SRCALPHA)
+        surf.fill(rgba)
+        _overlay_cache[key] = surf
+    return surf
+
+
 def draw_overlay_square(surface, r_idx, c_idx, rgba):
-    overlay = pygame.Surface((TILE_SIZE, TILE_SIZE), pygame.SRCALPHA)
-    overlay.fill(rgba)
     x = c_idx * TILE_SIZE
     y = (7 - r_idx) * TILE_SIZE
-    surface.blit(overlay, (x, y))
+    surface.blit(overlay_surface((TILE_SIZE, TILE_SIZE), rgba), (x, y))
+
+
+class HighlightLayer:
+    """
+    Capa transparente del tamaño del tablero con la selección y las
+    jugadas legales. Se recompone solo cuando cambian; dibujarla es un
+    único blit, sin importar cuántos destinos tenga la pieza.
+    """
+
+    def __init__(self):
+        self.surface = pygame.Surface((BOARD_PIXEL_W, BOARD_PIXEL_W), pygame.SRCALPHA)
+        self._key = None
+
+    def update(self, sel_sq: Optional[int], legal: List[int]) -> None:
+        key = (sel_sq, tuple(legal)) if sel_sq is not None else None
+        if key == self._key:
+            return
+        self._key = key
+        self.surface.fill((0, 0, 0, 0))
+        if sel_sq is None:
+            return
+        # selección y destinos no se pisan: fill deja el RGBA tal cual
+        self.surface.fill(SEL_COLOR, square_rect(sel_sq >> 3, sel_sq & 7))
+        for d in legal:
+            self.surface.fill(MOVE_COLOR, square_rect(d >> 3, d & 7))
+
+    def draw(self, surface) -> None:
+        surface.blit(self.surface, (0, 0))
 
 
 # ---------- barra lateral ----------
@@ -226,455 +293,6 @@ def draw_sidebar(surface, save_icon, close_icon, draw_icon, resign_icon, font):
     return rects
 
 
-# ---------- lógica de ataque / seguridad ----------
-def enemy_at(board: Board, dst: Coordenate, my_color: str):
-    p = board.get_piece_at(dst)
-    return p and getattr(p, "color", None) != my_color
-
-
-def same_color_at(board: Board, dst: Coordenate, my_color: str):
-    p = board.get_piece_at(dst)
-    return p and getattr(p, "color", None) == my_color
-
-
-def path_clear(board: Board, a: Coordenate, b: Coordenate):
-    return all(board.is_empty(c) for c in board.squares_between(a, b))
-
-
-def king_safe_after(board: Board, src: Coordenate, dst: Coordenate, color: str, ep_target):
-    enemy = "black" if color == "white" else "white"
-    mover = board.get_piece_at(src)
-    if mover is None:
-        return False
-
-    name = getattr(mover, "name", getattr(mover, "type", None))
-
-    # --- Enroque ---
-    is_castle = False
-    castle_side = None  # "king" o "queen"
-
-    if name == "king":
-        if color == "white" and src.row == 1 and src.col == "e":
-            if dst.row == 1 and dst.col == "g":
-                is_castle = True
-                castle_side = "king"
-            elif dst.row == 1 and dst.col == "c":
-                is_castle = True
-                castle_side = "queen"
-        elif color == "black" and src.row == 8 and src.col == "e":
-            if dst.row == 8 and dst.col == "g":
-                is_castle = True
-                castle_side = "king"
-            elif dst.row == 8 and dst.col == "c":
-                is_castle = True
-                castle_side = "queen"
-
-    if is_castle:
-        king_orig = mover
-        if castle_side == "king":
-            rook_src = Coordenate(src.row, "h")
-            rook_dst = Coordenate(src.row, "f")
-        else:
-            rook_src = Coordenate(src.row, "a")
-            rook_dst = Coordenate(src.row, "d")
-
-        rook = board.get_piece_at(rook_src)
-        captured_dst = board.get_piece_at(dst)
-
-        board._set_piece_at(src, None)
-        board._set_piece_at(dst, mover)
-        if rook:
-            board._set_piece_at(rook_src, None)
-            board._set_piece_at(rook_dst, rook)
-
-        try:
-            kpos = dst
-            return not board.is_square_attacked(kpos, enemy)
-        finally:
-            if rook:
-                board._set_piece_at(rook_dst, None)
-                board._set_piece_at(rook_src, rook)
-            board._set_piece_at(dst, captured_dst)
-            board._set_piece_at(src, king_orig)
-
-    # --- En passant ---
-    is_ep = (
-        name == "pawn" and
-        ep_target is not None and
-        dst.row == ep_target.row and
-        dst.col == ep_target.col and
-        dst.col != src.col and
-        board.is_empty(dst)
-    )
-
-    captured_dst = board.get_piece_at(dst)
-    captured_ep = None
-    cap_sq = None
-
-    if is_ep:
-        cap_sq = Coordenate(src.row, dst.col)
-        captured_ep = board.get_piece_at(cap_sq)
-
-    board._set_piece_at(src, None)
-    if is_ep:
-        board._set_piece_at(cap_sq, None)
-    board._set_piece_at(dst, mover)
-
-    try:
-        kpos = dst if name == "king" else board.king_position(color)
-        return not board.is_square_attacked(kpos, enemy)
-    finally:
-        board._set_piece_at(dst, captured_dst)
-        if is_ep:
-            board._set_piece_at(cap_sq, captured_ep)
-        board._set_piece_at(src, mover)
-
-
-# ---------- generación de movimientos ----------
-def generate_moves(board: Board, src: Coordenate, turn: str, ep_target):
-    p = board.get_piece_at(src)
-    if not p:
-        return []
-    if getattr(p, "color", None) != turn:
-        return []
-    if getattr(p, "pinned", False):
-        return []
-
-    name = getattr(p, "name", getattr(p, "type", None))
-    color = getattr(p, "color", None)
-    enemy = "black" if color == "white" else "white"
-    res: List[Coordenate] = []
-
-    def push(dst: Coordenate):
-        if dst.col not in "abcdefgh" or not (1 <= dst.row <= 8):
-            return
-        if same_color_at(board, dst, color):
-            return
-        res.append(dst)
-
-    # Caballo
-    if name == "knight":
-        for dx, dy in [(1, 2), (2, 1), (2, -1), (1, -2),
-                       (-1, -2), (-2, -1), (-2, 1), (-1, 2)]:
-            push(Coordenate(src.row + dy, chr(ord(src.col) + dx)))
-        return res
-
-    # Rey + enroque
-    if name == "king":
-        for dx, dy in [(-1, -1), (-1, 0), (-1, 1),
-                       (0, -1),             (0, 1),
-                       (1, -1),  (1, 0),  (1, 1)]:
-            push(Coordenate(src.row + dy, chr(ord(src.col) + dx)))
-
-        if hasattr(p, "has_moved") and not p.has_moved:
-            row = 1 if color == "white" else 8
-
-            # enroque corto
-            rook = board.get_piece_at(Coordenate(row, "h"))
-            if rook and getattr(rook, "color", None) == color:
-                if not getattr(rook, "has_moved", False):
-                    f = Coordenate(row, "f")
-                    g = Coordenate(row, "g")
-                    if board.is_empty(f) and board.is_empty(g):
-                        if (not board.is_square_attacked(src, enemy)
-                            and not board.is_square_attacked(f, enemy)
-                            and not board.is_square_attacked(g, enemy)):
-                            res.append(g)
-
-            # enroque largo
-            rook = board.get_piece_at(Coordenate(row, "a"))
-            if rook and getattr(rook, "color", None) == color:
-                if not getattr(rook, "has_moved", False):
-                    d = Coordenate(row, "d")
-                    c = Coordenate(row, "c")
-                    b = Coordenate(row, "b")
-                    if board.is_empty(d) and board.is_empty(c) and board.is_empty(b):
-                        if (not board.is_square_attacked(src, enemy)
-                            and not board.is_square_attacked(d, enemy)
-                            and not board.is_square_attacked(c, enemy)):
-                            res.append(c)
-
-        return res
-
-    # Deslizantes
-    if name in ("bishop", "rook", "queen"):
-        dirs = []
-        if name in ("bishop", "queen"):
-            dirs += [(1, 1), (1, -1), (-1, 1), (-1, -1)]
-        if name in ("rook", "queen"):
-            dirs += [(1, 0), (-1, 0), (0, 1), (0, -1)]
-        for dx, dy in dirs:
-            step = 1
-            while True:
-                dst = Coordenate(src.row + dy * step, chr(ord(src.col) + dx * step))
-                if dst.col not in "abcdefgh" or not (1 <= dst.row <= 8):
-                    break
-                if not path_clear(board, src, dst):
-                    break
-                if same_color_at(board, dst, color):
-                    break
-                res.append(dst)
-                if enemy_at(board, dst, color):
-                    break
-                step += 1
-        return res
-
-    # Peón
-    if name == "pawn":
-        direction = 1 if color == "white" else -1
-        start_row = 2 if color == "white" else 7
-
-        # avance 1
-        one = Coordenate(src.row + direction, src.col)
-        if 1 <= one.row <= 8 and board.is_empty(one):
-            res.append(one)
-
-            # avance doble
-            if src.row == start_row:
-                two = Coordenate(src.row + 2*direction, src.col)
-                inter = Coordenate(src.row + direction, src.col)
-                if (1 <= two.row <= 8 and
-                    board.is_empty(two) and board.is_empty(inter)):
-                    res.append(two)
-
-        # capturas normales
-        for dx in (-1, 1):
-            diag = Coordenate(src.row + direction, chr(ord(src.col) + dx))
-            if 1 <= diag.row <= 8 and diag.col in "abcdefgh":
-                if enemy_at(board, diag, color):
-                    res.append(diag)
-
-        # captura al paso
-        if ep_target is not None:
-            if (ep_target.row == src.row + direction and
-                abs(ord(ep_target.col) - ord(src.col)) == 1):
-                victim_sq = Coordenate(src.row, ep_target.col)
-                victim = board.get_piece_at(victim_sq)
-                if victim:
-                    vname = getattr(victim, "name", getattr(victim, "type", None))
-                    vcolor = getattr(victim, "color", None)
-                    if vname == "pawn" and vcolor != color:
-                        res.append(ep_target)
-
-        return res
-
-    return res
-
-
-def legal_moves(board: Board, src: Coordenate, turn: str, ep_target):
-    res: List[Coordenate] = []
-    for dst in generate_moves(board, src, turn, ep_target):
-        if king_safe_after(board, src, dst, turn, ep_target):
-            res.append(dst)
-    return res
-
-
-# ---------- aplicar movimiento ----------
-def apply_simple_move(board: Board, src: Coordenate, dst: Coordenate, ep_target):
-    mover = board.get_piece_at(src)
-    if not mover:
-        return None
-
-    name = getattr(mover, "name", getattr(mover, "type", None))
-    color = getattr(mover, "color", None)
-
-    # Enroque
-    is_castle = False
-    castle_side = None
-    if name == "king":
-        if color == "white" and src.row == 1 and src.col == "e":
-            if dst.row == 1 and dst.col == "g":
-                is_castle = True
-                castle_side = "king"
-            elif dst.row == 1 and dst.col == "c":
-                is_castle = True
-                castle_side = "queen"
-        elif color == "black" and src.row == 8 and src.col == "e":
-            if dst.row == 8 and dst.col == "g":
-                is_castle = True
-                castle_side = "king"
-            elif dst.row == 8 and dst.col == "c":
-                is_castle = True
-                castle_side = "queen"
-
-    if is_castle:
-        board._set_piece_at(src, None)
-        board._set_piece_at(dst, mover)
-
-        if castle_side == "king":
-            rook_src = Coordenate(src.row, "h")
-            rook_dst = Coordenate(src.row, "f")
-        else:
-            rook_src = Coordenate(src.row, "a")
-            rook_dst = Coordenate(src.row, "d")
-
-        rook = board.get_piece_at(rook_src)
-        if rook:
-            board._set_piece_at(rook_src, None)
-            board._set_piece_at(rook_dst, rook)
-            # marcar torre como movida
-            setattr(rook, "has_moved", True)
-
-        if hasattr(mover, "has_moved"):
-            mover.has_moved = True
-        else:
-            setattr(mover, "has_moved", True)
-
-        return None  # enroque no genera en passant
-
-    # en passant
-    is_ep = (
-        name == "pawn" and
-        ep_target is not None and
-        dst.row == ep_target.row and
-        dst.col == ep_target.col and
-        dst.col != src.col and
-        board.is_empty(dst)
-    )
-
-    if is_ep:
-        cap_sq = Coordenate(src.row, dst.col)
-        board._set_piece_at(cap_sq, None)
-
-    # captura normal
-    if not is_ep:
-        if board.get_piece_at(dst):
-            board._set_piece_at(dst, None)
-
-    # mover pieza
-    board._set_piece_at(src, None)
-    board._set_piece_at(dst, mover)
-
-    # actualizar posición interna (aunque tengas el lío row/col, lo dejamos como está)
-    try:
-        mover.position.move_row(dst.row - src.row)
-        mover.position.move_col(ord(dst.col) - ord(src.col))
-    except Exception:
-        pass
-
-    # marcar rey/torre como movidos
-    if name == "king":
-        if hasattr(mover, "has_moved"):
-            mover.has_moved = True
-        else:
-            setattr(mover, "has_moved", True)
-    if name == "rook":
-        setattr(mover, "has_moved", True)
-
-    # promoción
-    if name == "pawn":
-        if (color == "white" and dst.row == 8) or (color == "black" and dst.row == 1):
-            q = Queen(color, dst.col, dst.row)
-            board._set_piece_at(dst, q)
-
-    # nueva casilla de en passant
-    if name == "pawn" and dst.col == src.col and abs(dst.row - src.row) == 2:
-        mid_row = (src.row + dst.row) // 2
-        return Coordenate(mid_row, src.col)
-
-    return None
-
-
-# ---------- chequeo de jaque / mate / ahogado ----------
-def is_in_check(board: Board, color: str) -> bool:
-    kpos = board.king_position(color)
-    enemy = "black" if color == "white" else "white"
-    return board.is_square_attacked(kpos, enemy)
-
-
-def has_any_legal_move(board: Board, color: str, ep_target) -> bool:
-    for r in range(8):
-        for c in range(8):
-            coord = idx_to_coord(r, c)
-            piece = board.get_piece_at(coord)
-            if not piece:
-                continue
-            if getattr(piece, "color", None) != color:
-                continue
-            moves = legal_moves(board, coord, color, ep_target)
-            if moves:
-                return True
-    return False
-
-
-def is_checkmate(board: Board, color: str, ep_target) -> bool:
-    if not is_in_check(board, color):
-        return False
-    if has_any_legal_move(board, color, ep_target):
-        return False
-    return True
-
-
-def is_stalemate(board: Board, color: str, ep_target) -> bool:
-    if is_in_check(board, color):
-        return False
-    if has_any_legal_move(board, color, ep_target):
-        return False
-    return True
-
-
-# ---------- guardado y carga ----------
-def coord_to_alg(c: Coordenate) -> str:
-    return f"{c.col}{c.row}"
-
-
-def alg_to_coord(sq: str) -> Coordenate:
-    return Coordenate(int(sq[1]), sq[0])
-
-
-def save_game(history: List[str]):
-    if not history:
-        print("[INFO] Nada para guardar.")
-        return
-    os.makedirs(GAMES_DIR, exist_ok=True)
-    now = datetime.now().strftime("%Y%m%d_%H%M%S")
-    path = os.path.join(GAMES_DIR, f"game_{now}.chess")
-    try:
-        with open(path, "w", encoding="utf-8") as f:
-            for mv in history:
-                f.write(mv + "\n")
-        print(f"[INFO] Partida guardada en {path}")
-    except Exception as e:
-        print(f"[ERROR] No se pudo guardar la partida: {e}")
-
-
-def list_saved_games() -> List[str]:
-    if not os.path.isdir(GAMES_DIR):
-        return []
-    files = [
-        os.path.join(GAMES_DIR, f)
-        for f in os.listdir(GAMES_DIR)
-        if f.lower().endswith(".chess")
-    ]
-    files.sort()
-    return files
-
-
-def load_game_from_file(path: str):
-    board = Board()
-    turn = "white"
-    ep = None
-    history: List[str] = []
-    try:
-        with open(path, "r", encoding="utf-8") as f:
-            lines = [ln.strip() for ln in f if ln.strip()]
-    except Exception as e:
-        print(f"[ERROR] No se pudo leer {path}: {e}")
-        return board, "white", None, []
-
-    for mv in lines:
-        if len(mv) < 4:
-            continue
-        src = alg_to_coord(mv[:2])
-        dst = alg_to_coord(mv[2:4])
-        ep = apply_simple_move(board, src, dst, ep)
-        history.append(mv)
-        turn = "black" if turn == "white" else "white"
-
-    print(f"[INFO] Partida cargada desde {path}")
-    return board, turn, ep, history
-
-
 # ---------- menú principal ----------
 def draw_menu(screen, bg, font):
     if bg:
@@ -688,9 +306,10 @@ def draw_menu(screen, bg, font):
 def make_menu_buttons(font):
     w, h = 260, 60
     x = (WINDOW_W - w) // 2
-    new_rect = pygame.Rect(x, WINDOW_H // 2 - 40, w, h)
-    load_rect = pygame.Rect(x, WINDOW_H // 2 + 40, w, h)
-    return (new_rect, "Nueva partida"), (load_rect, "Cargar partida")
+    new_rect = pygame.Rect(x, WINDOW_H // 2 - 60, w, h)
+    engine_rect = pygame.Rect(x, WINDOW_H // 2 + 20, w, h)
+    load_rect = pygame.Rect(x, WINDOW_H // 2 + 100, w, h)
+    return (new_rect, "Nueva partida"), (engine_rect, "Contra la IA"), (load_rect, "Cargar partida")
 
 
 def draw_menu_buttons(screen, buttons, font):
@@ -701,7 +320,28 @@ def draw_menu_buttons(screen, buttons, font):
 
 
 # ---------- menú cargar partida ----------
-def draw_load_menu(screen, bg, font, files, back_icon):
+def get_load_menu_rects():
+    rects = {}
+
+    # botón volver
+    rects["back"] = pygame.Rect(0, 0, 72, 72)
+    rects["back"].center = (WINDOW_W // 2, WINDOW_H - 80)
+
+    # página anterior / siguiente
+    rects["prev"] = pygame.Rect(0, 0, 72, 72)
+    rects["prev"].center = (WINDOW_W // 2 - 120, WINDOW_H - 80)
+    rects["next"] = pygame.Rect(0, 0, 72, 72)
+    rects["next"].center = (WINDOW_W // 2 + 120, WINDOW_H - 80)
+    return rects
+
+
+def load_item_rects(n: int) -> List[pygame.Rect]:
+    y = 100
+    w, h = 560, 40
+    return [pygame.Rect((WINDOW_W - w) // 2, y + i * (h + 10), w, h) for i in range(n)]
+
+
+def draw_load_menu(screen, bg, font, entries, back_icon, page: int, pages: int):
     if bg:
         screen.blit(bg, (0, 0))
     else:
@@ -710,9 +350,10 @@ def draw_load_menu(screen, bg, font, files, back_icon):
     title = font.render("Cargar partida", True, (240, 240, 240))
     screen.blit(title, title.get_rect(center=(WINDOW_W // 2, 40)))
 
+    rects = get_load_menu_rects()
+
     # botón volver
-    back_rect = pygame.Rect(0, 0, 72, 72)
-    back_rect.center = (WINDOW_W // 2, WINDOW_H - 80)
+    back_rect = rects["back"]
     pygame.draw.rect(screen, (80, 80, 80), back_rect, border_radius=8)
     if back_icon:
         screen.blit(back_icon, back_icon.get_rect(center=back_rect.center))
@@ -720,25 +361,30 @@ def draw_load_menu(screen, bg, font, files, back_icon):
         txt = font.render("Volver", True, (240, 240, 240))
         screen.blit(txt, txt.get_rect(center=back_rect.center))
 
-    # lista de archivos
-    items = []
-    y = 120
-    w, h = 400, 40
-    for i, path in enumerate(files):
-        rect = pygame.Rect((WINDOW_W - w) // 2, y + i * (h + 10), w, h)
+    # paginado (solo se dibuja lo que tiene sentido apretar)
+    for name, label, enabled in (("prev", "<", page > 0), ("next", ">", page + 1 < pages)):
+        if enabled:
+            pygame.draw.rect(screen, (80, 80, 80), rects[name], border_radius=8)
+            txt = font.render(label, True, (240, 240, 240))
+            screen.blit(txt, txt.get_rect(center=rects[name].center))
+    if pages > 1:
+        txt = font.render(f"{page + 1}/{pages}", True, (240, 240, 240))
+        screen.blit(txt, txt.get_rect(center=(WINDOW_W // 2, WINDOW_H - 20)))
+
+    # partidas de esta página
+    if not entries:
+        txt = font.render("No hay partidas guardadas", True, (200, 200, 200))
+        screen.blit(txt, txt.get_rect(center=(WINDOW_W // 2, WINDOW_H // 2)))
+    for rect, entry in zip(load_item_rects(len(entries)), entries):
         pygame.draw.rect(screen, (60, 60, 60), rect, border_radius=8)
-        txt = font.render(os.path.basename(path), True, (230, 230, 230))
+        label = f"{os.path.splitext(entry.name)[0]}   {entry.plies}  {RESULT_NAMES[entry.result]}"
+        txt = font.render(label, True, (230, 230, 230))
         screen.blit(txt, txt.get_rect(center=rect.center))
-        items.append((rect, path))
-
-    return items, back_rect
 
 
 # ---------- popups (overlay oscuro) ----------
 def draw_overlay_dark(screen):
-    overlay = pygame.Surface((WINDOW_W, WINDOW_H), pygame.SRCALPHA)
-    overlay.fill((0, 0, 0, 180))
-    screen.blit(overlay, (0, 0))
+    screen.blit(overlay_surface((WINDOW_W, WINDOW_H), (0, 0, 0, 180)), (0, 0))
 
 
 def get_draw_offer_popup_rects():
@@ -863,34 +509,122 @@ def main():
     # estado de partida
     board: Optional[Board] = None
     turn = "white"
-    sel_sq: Optional[Tuple[int, int]] = None
+    sel_sq: Optional[int] = None        # casilla 0..63 (a1 = 0)
     hover_sq: Optional[Tuple[int, int]] = None
-    legal: List[Coordenate] = []
+    legal: List[int] = []
     ep_target: Optional[Coordenate] = None
     history: List[str] = []
+    engine_color: Optional[str] = None  # None = dos jugadores
 
     # estado menú de carga
-    load_files: List[str] = []
+    # (el índice de games/ evita listar la carpeta: se leen solo los registros de la página)
+    game_index = GameIndex(GAMES_DIR)
+    load_page = 0
+    load_entries: List[IndexEntry] = []
 
     # estado de fin / mensajes
     result_message: str = ""
 
+    # última pantalla dibujada (para saber qué hay que redibujar)
+    drawn_key = None
+    drawn_views: Optional[List[tuple]] = None
+    highlight = HighlightLayer()
+
+    # fin de partida, ayudas y motor en un hilo aparte (analysis.py)
+    analysis = AnalysisService(ENGINE_TIME)
+
     running = True
     while running:
-        for event in pygame.event.get():
+        # ---------- DIBUJO ----------
+        # Pantalla completa solo al cambiar de pantalla o popup; en partida se
+        # redibujan únicamente las casillas cuya vista cambió (hover,
+        # selección, jugadas) y se actualizan solo esos rects.
+        screen_key = (state, id(board), result_message, load_page, tuple(load_entries))
+        views = square_views(board, sel_sq, legal, hover_sq if state == "game" else None) if board else None
+        highlight.update(sel_sq, legal)
+
+        if screen_key != drawn_key:
+            if state == "menu":
+                draw_menu(screen, bg_menu, font)
+                draw_menu_buttons(screen, make_menu_buttons(font), font)
+
+            elif state == "load_menu":
+                pages = max(1, -(-len(game_index) // LOAD_PAGE_SIZE))
+                draw_load_menu(screen, bg_menu, font, load_entries, back_icon, load_page, pages)
+
+            elif state in ("game", "popup_draw", "popup_resign", "game_over") and board is not None:
+                # base: tablero + piezas + resaltados + barra lateral
+                draw_board(screen, board_bg)
+                draw_pieces(screen, board, sprites)
+                highlight.draw(screen)
+                if state == "game" and hover_sq:
+                    draw_overlay_square(screen, hover_sq[0], hover_sq[1], HOVER_COLOR)
+
+                draw_sidebar(screen, save_icon, close_icon, draw_icon, resign_icon, font)
+
+                # popups encima
+                if state == "popup_draw":
+                    draw_draw_offer_popup(screen, font)
+                elif state == "popup_resign":
+                    draw_resign_popup(screen, font)
+                elif state == "game_over":
+                    draw_game_over_popup(screen, font, result_message)
+
+            pygame.display.flip()
+
+        elif state == "game" and views != drawn_views:
+            dirty = [
+                draw_square(screen, board_bg, board, sprites, sq, highlight, view[2])
+                for sq, view in enumerate(views)
+                if view != drawn_views[sq]
+            ]
+            pygame.display.update(dirty)
+
+        drawn_key, drawn_views = screen_key, views
+
+        # ---------- EVENTOS ----------
+        # Sin nada pendiente se duerme hasta el próximo evento (CPU en reposo);
+        # los resultados del análisis también llegan como eventos
+        events = [pygame.event.wait()] + pygame.event.get()
+
+        for event in events:
             if event.type == pygame.QUIT:
                 running = False
                 break
             if event.type == pygame.KEYDOWN and event.key == pygame.K_ESCAPE:
                 running = False
                 break
+            if event.type in EXPOSE_EVENTS:
+                # fuerza el redibujo completo + flip en la próxima vuelta
+                drawn_key, drawn_views = None, None
+                continue
+
+            # -------------------- RESULTADOS DEL ANÁLISIS --------------------
+            if event.type == ANALYSIS_EVENT:
+                # también con un popup abierto: la partida sigue por debajo
+                if not analysis.is_current(event) or state == "game_over" or board is None:
+                    continue
+                if event.kind == "end" and event.result:
+                    result_message = event.result
+                    state = "game_over"
+                    analysis.cancel()
+                elif event.kind == "engine" and event.result is not None:
+                    mv = event.result
+                    src, dst = mv & 63, (mv >> 6) & 63
+                    history.append(sq_to_alg(src) + sq_to_alg(dst))
+                    apply_move_sq(board, src, dst, to_square(ep_target) if ep_target else None)
+                    ep_target = board.ep_target()
+                    turn = "black" if turn == "white" else "white"
+                    analysis.position_changed(board, turn, ep_target, engine_color)
+                continue
 
             # -------------------- MENÚ PRINCIPAL --------------------
             if state == "menu":
-                new_btn, load_btn = make_menu_buttons(font)
+                new_btn, engine_btn, load_btn = make_menu_buttons(font)
                 if event.type == pygame.MOUSEBUTTONDOWN and event.button == 1:
                     mx, my = event.pos
-                    if new_btn[0].collidepoint(mx, my):
+                    if new_btn[0].collidepoint(mx, my) or engine_btn[0].collidepoint(mx, my):
+                        engine_color = ENGINE_COLOR if engine_btn[0].collidepoint(mx, my) else None
                         board = Board()
                         turn = "white"
                         sel_sq = None
@@ -898,9 +632,13 @@ def main():
                         legal = []
                         ep_target = None
                         history = []
+                        analysis.position_changed(board, turn, ep_target, engine_color)
                         state = "game"
                     elif load_btn[0].collidepoint(mx, my):
-                        load_files = list_saved_games()
+                        engine_color = None
+                        game_index.sync()
+                        load_page = 0
+                        load_entries = game_index.page(0, LOAD_PAGE_SIZE)
                         state = "load_menu"
 
             # -------------------- MENÚ DE CARGA --------------------
@@ -908,26 +646,26 @@ def main():
                 if event.type == pygame.MOUSEBUTTONDOWN and event.button == 1:
                     mx, my = event.pos
 
-                    # reconstruir rects de archivos
-                    items = []
-                    y = 120
-                    w, h = 400, 40
-                    for i, path in enumerate(load_files):
-                        rect = pygame.Rect((WINDOW_W - w) // 2, y + i * (h + 10), w, h)
-                        items.append((rect, path))
-
-                    # botón volver
-                    back_rect = pygame.Rect(0, 0, 72, 72)
-                    back_rect.center = (WINDOW_W // 2, WINDOW_H - 80)
+                    rects = get_load_menu_rects()
 
-                    if back_rect.collidepoint(mx, my):
+                    if rects["back"].collidepoint(mx, my):
                         state = "menu"
                         continue
 
+                    # cambiar de página: solo se leen los registros de la nueva
+                    step = (-1 if rects["prev"].collidepoint(mx, my)
+                            else 1 if rects["next"].collidepoint(mx, my) else 0)
+                    if step:
+                        new_page = load_page + step
+                        if 0 <= new_page * LOAD_PAGE_SIZE < len(game_index):
+                            load_page = new_page
+                            load_entries = game_index.page(load_page * LOAD_PAGE_SIZE, LOAD_PAGE_SIZE)
+                        continue
+
                     clicked = None
-                    for rect, path in items:
+                    for rect, entry in zip(load_item_rects(len(load_entries)), load_entries):
                         if rect.collidepoint(mx, my):
-                            clicked = path
+                            clicked = game_index.file_path(entry)
                             break
 
                     if clicked:
@@ -935,6 +673,7 @@ def main():
                         sel_sq = None
                         hover_sq = None
                         legal = []
+                        analysis.position_changed(board, turn, ep_target, engine_color)
                         state = "game"
 
             # -------------------- POPUP TABLAS --------------------
@@ -974,6 +713,7 @@ def main():
                         legal = []
                         ep_target = None
                         history = []
+                        analysis.position_changed(board, turn, ep_target, engine_color)
                         state = "game"
                     elif rects["menu"].collidepoint(mx, my):
                         # Volver al menú
@@ -983,11 +723,25 @@ def main():
                         legal = []
                         ep_target = None
                         history = []
+                        analysis.cancel()
                         state = "menu"
 
             # -------------------- MODO PARTIDA --------------------
             elif state == "game" and board is not None:
-                if event.type == pygame.MOUSEMOTION:
+                if event.type == pygame.KEYDOWN and event.key == pygame.K_BACKSPACE:
+                    # deshacer última jugada
+                    # contra la IA se deshace también su respuesta
+                    # (si el motor está pensando, se corta y se deshace la del humano)
+                    plies = 2 if engine_color and turn != engine_color else 1
+                    for _ in range(min(plies, len(history))):
+                        ep_target = undo_last_move(board)
+                        history.pop()
+                        turn = "black" if turn == "white" else "white"
+                    sel_sq = None
+                    legal = []
+                    analysis.position_changed(board, turn, ep_target, engine_color)
+
+                elif event.type == pygame.MOUSEMOTION:
                     mi = mouse_to_indices(*event.pos)
                     hover_sq = (mi[0], mi[1]) if mi else None
 
@@ -999,7 +753,11 @@ def main():
                         rects = get_sidebar_rects()
 
                         if rects["save"].collidepoint(mx, my):
-                            save_game(history)
+                            # al día antes de guardar: add() toma el mtime nuevo de la carpeta
+                            game_index.sync()
+                            path = save_game(history)
+                            if path:
+                                game_index.add(path)
 
                         elif rects["close"].collidepoint(mx, my):
                             # volver al menú, descartando la posición actual
@@ -1009,6 +767,7 @@ def main():
                             legal = []
                             ep_target = None
                             history = []
+                            analysis.cancel()
                             state = "menu"
 
                         elif rects["draw"].collidepoint(mx, my):
@@ -1025,99 +784,60 @@ def main():
                     mi = mouse_to_indices(mx, my)
                     if not mi:
                         continue
+                    # mientras piensa el motor el tablero no acepta jugadas
+                    if turn == engine_color:
+                        continue
                     r, c = mi
-                    clicked = idx_to_coord(r, c)
+                    clicked = r * 8 + c
+                    ep_sq = to_square(ep_target) if ep_target else None
 
                     if sel_sq is None:
-                        p = board.get_piece_at(clicked)
-                        if p and getattr(p, "color", None) == turn:
-                            sel_sq = (r, c)
-                            legal = legal_moves(board, clicked, turn, ep_target)
+                        p = board.bb.piece_at(clicked)
+                        if p and p[1] == turn:
+                            sel_sq = clicked
+                            legal = legal_move_map(board, turn, ep_target).get(clicked, [])
                         else:
                             sel_sq = None
                             legal = []
                     else:
                         # clic en la misma casilla -> deseleccionar
-                        if sel_sq == (r, c):
+                        if sel_sq == clicked:
                             sel_sq = None
                             legal = []
                             continue
 
-                        src = idx_to_coord(sel_sq[0], sel_sq[1])
-                        q = board.get_piece_at(clicked)
+                        q = board.bb.piece_at(clicked)
 
                         # cambiar selección si clic en otra propia
-                        if q and getattr(q, "color", None) == turn:
-                            sel_sq = (r, c)
-                            legal = legal_moves(board, clicked, turn, ep_target)
+                        if q and q[1] == turn:
+                            sel_sq = clicked
+                            legal = legal_move_map(board, turn, ep_target).get(clicked, [])
                             continue
 
                         # si el destino es legal, mover
-                        if any(d.row == clicked.row and d.col == clicked.col for d in legal):
-                            mv = f"{src.col}{src.row}{clicked.col}{clicked.row}"
+                        if clicked in legal:
+                            mv = sq_to_alg(sel_sq) + sq_to_alg(clicked)
                             history.append(mv)
 
-                            ep_target = apply_simple_move(board, src, clicked, ep_target)
+                            apply_move_sq(board, sel_sq, clicked, ep_sq)
+                            ep_target = board.ep_target()
 
                             # cambiar turno
                             turn = "black" if turn == "white" else "white"
 
-                            # comprobar mate / ahogado
-                            if is_checkmate(board, turn, ep_target):
-                                if turn == "white":
-                                    result_message = "Negras ganan por jaque mate"
-                                else:
-                                    result_message = "Blancas ganan por jaque mate"
-                                state = "game_over"
-                            elif is_stalemate(board, turn, ep_target):
-                                result_message = "Tablas por ahogado"
-                                state = "game_over"
+                            # mate / ahogado (y la respuesta del motor) llegan como eventos
+                            analysis.position_changed(board, turn, ep_target, engine_color)
 
                         # reset selección
                         sel_sq = None
                         legal = []
 
-        # ---------- DIBUJO ----------
         if not running:
             break
 
-        if state == "menu":
-            draw_menu(screen, bg_menu, font)
-            draw_menu_buttons(screen, make_menu_buttons(font), font)
-
-        elif state == "load_menu":
-            draw_load_menu(screen, bg_menu, font, load_files, back_icon)
-
-        elif state in ("game", "popup_draw", "popup_resign", "game_over") and board is not None:
-            # base: tablero + piezas + barra lateral
-            draw_board(screen, board_bg)
-            draw_pieces(screen, board, sprites)
-
-            if sel_sq:
-                draw_overlay_square(screen, sel_sq[0], sel_sq[1], SEL_COLOR)
-                for d in legal:
-                    draw_overlay_square(
-                        screen,
-                        d.row - 1,
-                        ord(d.col) - ord('a'),
-                        MOVE_COLOR
-                    )
-            if hover_sq and state == "game":
-                draw_overlay_square(screen, hover_sq[0], hover_sq[1], HOVER_COLOR)
-
-            draw_sidebar(screen, save_icon, close_icon, draw_icon, resign_icon, font)
-
-            # popups encima
-            if state == "popup_draw":
-                draw_draw_offer_popup(screen, font)
-            elif state == "popup_resign":
-                draw_resign_popup(screen, font)
-            elif state == "game_over":
-                draw_game_over_popup(screen, font, result_message)
-
-        pygame.display.flip()
         clock.tick(60)
 
+    analysis.close()
     pygame.quit()
     sys.exit()
 
@@ -0,0 +1,140 @@
+# headless.py
+# ---------------------------------------------------------------------
+# Partidas sin ventana (no importa pygame):
+#   - selfplay: el motor juega contra sí mismo N partidas
+#   - replay:   reproduce archivos .chess y muestra cómo terminan
+#
+# Uso (desde la raíz del repo):
+#   python headless.py selfplay [--games N] [--time S] [--depth D]
+#                               [--random-plies K] [--seed X] [--out DIR]
+#   python headless.py replay archivo.chess [...]
+# ---------------------------------------------------------------------
+
+import argparse
+import os
+import random
+import sys
+import time
+from typing import List, Optional, Tuple
+
+from board.board import Board
+from board.movegen import generate_legal_moves, move_to_uci
+from engine.search import best_move
+from rules import (
+    alg_to_coord, apply_simple_move, game_end_message, load_game_from_file,
+)
+
+# Tope de medias jugadas por partida de selfplay
+MAX_PLIES = 300
+
+
+def _result(board: Board, turn: str, ep_target) -> Optional[str]:
+    """Mensaje de fin (mate, ahogado, 50 jugadas, triple repetición) o None."""
+    end = game_end_message(board, turn, ep_target)
+    if end:
+        return end
+    if board.bb.halfmove >= 100:
+        return "Tablas por la regla de las 50 jugadas"
+    if board.bb.is_repetition(2):
+        return "Tablas por triple repetición"
+    return None
+
+
+def play_engine_game(time_limit: Optional[float] = None, max_depth: int = 64,
+                     max_nodes: Optional[int] = None, random_plies: int = 0,
+                     rng: Optional[random.Random] = None,
+                     max_plies: int = MAX_PLIES) -> Tuple[List[str], str]:
+    """
+    Juega una partida motor contra motor. Las primeras 'random_plies' medias
+    jugadas son al azar (para que las partidas no sean todas iguales).
+    Devuelve (historial UCI, mensaje de resultado).
+    """
+    rng = rng or random.Random()
+    board = Board()
+    turn = "white"
+    ep = None
+    history: List[str] = []
+
+    while len(history) < max_plies:
+        if len(history) < random_plies:
+            mv = rng.choice(generate_legal_moves(board.bb, turn))
+        else:
+            mv = best_move(board, turn, ep, max_depth=max_depth,
+                           max_nodes=max_nodes, time_limit=time_limit)
+        uci = move_to_uci(mv)[:4]   # game.py guarda sin letra de promoción (siempre dama)
+        ep = apply_simple_move(board, alg_to_coord(uci[:2]), alg_to_coord(uci[2:4]), ep)
+        history.append(uci)
+        turn = "black" if turn == "white" else "white"
+        end = _result(board, turn, ep)
+        if end:
+            return history, end
+    return history, f"Sin resultado tras {max_plies} medias jugadas"
+
+
+def write_game(path: str, history: List[str]) -> None:
+    # Mismo formato que save_game: una jugada UCI por línea
+    with open(path, "w", encoding="utf-8") as f:
+        for mv in history:
+            f.write(mv + "\n")
+
+
+# --------------------------------- CLI -------------------------------------
+
+def cmd_selfplay(args) -> int:
+    rng = random.Random(args.seed)
+    if args.out:
+        os.makedirs(args.out, exist_ok=True)
+    t0 = time.perf_counter()
+    tally = {}
+    for i in range(args.games):
+        history, end = play_engine_game(args.time, args.depth, args.nodes,
+                                        args.random_plies, rng, args.max_plies)
+        tally[end] = tally.get(end, 0) + 1
+        print(f"partida {i + 1}: {len(history)} medias jugadas - {end}")
+        if args.out:
+            write_game(os.path.join(args.out, f"selfplay_{i + 1:04d}.chess"), history)
+    print(f"{args.games} partidas en {time.perf_counter() - t0:.1f}s")
+    for end, n in sorted(tally.items(), key=lambda kv: -kv[1]):
+        print(f"  {n:>5}  {end}")
+    return 0
+
+
+def cmd_replay(args) -> int:
+    for path in args.files:
+        if not os.path.isfile(path):
+            print(f"{path}: no existe")
+            continue
+        board, turn, ep, history = load_game_from_file(path)
+        end = _result(board, turn, ep) or f"en curso, mueven {'blancas' if turn == 'white' else 'negras'}"
+        print(f"{path}: {len(history)} medias jugadas - {end}")
+        if args.show:
+            print(board.to_ascii())
+    return 0
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Partidas sin interfaz gráfica")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    sp = sub.add_parser("selfplay", help="motor contra motor")
+    sp.add_argument("--games", type=int, default=1)
+    sp.add_argument("--time", type=float, default=None, help="segundos por jugada")
+    sp.add_argument("--depth", type=int, default=3, help="profundidad máxima")
+    sp.add_argument("--nodes", type=int, default=None, help="nodos máximos por jugada")
+    sp.add_argument("--random-plies", type=int, default=4, help="medias jugadas iniciales al azar")
+    sp.add_argument("--max-plies", type=int, default=MAX_PLIES)
+    sp.add_argument("--seed", type=int, default=None)
+    sp.add_argument("--out", default=None, help="carpeta donde guardar las partidas (.chess)")
+    sp.set_defaults(func=cmd_selfplay)
+
+    rp = sub.add_parser("replay", help="reproducir archivos .chess")
+    rp.add_argument("files", nargs="+")
+    rp.add_argument("--show", action="store_true", help="mostrar la posición final")
+    rp.set_defaults(func=cmd_replay)
+
+    args = parser.parse_args()
+    return args.func(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
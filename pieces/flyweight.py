@@ -0,0 +1,49 @@
+from typing import Tuple
+
+from board.bitboard import PIECE_NAMES, COLORS, FEN_LETTER, piece_code
+
+# ---------------------------------------------------------------------
+# Piezas del tablero como flyweights: hay exactamente 12 objetos (uno por
+# tipo y color) y todas las casillas comparten el mismo. No guardan
+# posición ni flags: dónde está la pieza lo sabe el tablero y el estado
+# de partida (enroques, en passant) lo guarda BitboardPosition.
+#
+# Son inmutables y se comparan por identidad: PIECES[code] is PIECES[code].
+# ---------------------------------------------------------------------
+
+
+class PieceType:
+    __slots__ = ("code", "name", "color", "letter")
+
+    def __init__(self, code: int):
+        object.__setattr__(self, "code", code)
+        object.__setattr__(self, "name", PIECE_NAMES[code % 6])
+        object.__setattr__(self, "color", COLORS[code // 6])
+        letter = FEN_LETTER[code % 6]
+        object.__setattr__(self, "letter", letter if code < 6 else letter.lower())
+
+    @property
+    def type(self) -> str:
+        # Mismo nombre de atributo que pieces/piece.py
+        return self.name
+
+    def __setattr__(self, attr, value):
+        raise AttributeError("PieceType es inmutable")
+
+    def __reduce__(self):
+        # Al copiar o pasar entre procesos se recupera el mismo objeto
+        return piece_from_code, (self.code,)
+
+    def __repr__(self) -> str:
+        return f"<{self.color} {self.name}>"
+
+
+PIECES: Tuple[PieceType, ...] = tuple(PieceType(code) for code in range(12))
+
+
+def piece_from_code(code: int) -> PieceType:
+    return PIECES[code]
+
+
+def piece_for(name: str, color: str) -> PieceType:
+    return PIECES[piece_code(name, color)]
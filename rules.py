@@ -0,0 +1,358 @@
+# rules.py
+# ---------------------------------------------------------------------
+# Reglas del juego sin pygame: generación y validación de jugadas,
+# aplicar/deshacer, jaque mate / ahogado y guardado/carga de partidas
+# (.chess). game.py las importa desde acá; headless.py y las
+# herramientas por lotes las usan sin cargar SDL.
+# ---------------------------------------------------------------------
+
+import os
+import threading
+from collections import OrderedDict
+from typing import Dict, List, Optional
+from datetime import datetime
+
+from board.attacks import (
+    BETWEEN, DIAGONAL_DIRS, ORTHOGONAL_DIRS, ALL_DIRS, KNIGHT_ATTACKS, KING_ATTACKS,
+    PAWN_ATTACKS, ray_attacks,
+)
+from board.board import Board
+from board.bitboard import (
+    FILES, COLORS, WHITE, PAWN, KNIGHT, BISHOP, ROOK, QUEEN, KING, iter_bits,
+    CASTLE_WK, CASTLE_WQ, CASTLE_BK, CASTLE_BQ,
+)
+from board.coordenates import Coordenate, to_square, from_square
+from board.movegen import generate_legal_moves, encode_move
+from storage.chessfiles import GAMES_DIR
+
+# Direcciones (board/attacks.py) de cada pieza deslizante
+SLIDER_DIRS = {
+    BISHOP: DIAGONAL_DIRS,
+    ROOK: ORTHOGONAL_DIRS,
+    QUEEN: ALL_DIRS,
+}
+
+
+# ---------- lógica de ataque / seguridad ----------
+def enemy_at(board: Board, dst: Coordenate, my_color: str):
+    p = board.get_piece_at(dst)
+    return p and p.color != my_color
+
+
+def same_color_at(board: Board, dst: Coordenate, my_color: str):
+    p = board.get_piece_at(dst)
+    return p and p.color == my_color
+
+
+def path_clear(board: Board, a: Coordenate, b: Coordenate):
+    between = BETWEEN[to_square(a)][to_square(b)]
+    return not between & board.bb.occupied
+
+
+def king_safe_after(board: Board, src: Coordenate, dst: Coordenate, color: str, ep_target):
+    return king_safe_after_sq(board, to_square(src), to_square(dst), color, _ep_sq(ep_target))
+
+
+def king_safe_after_sq(board: Board, s: int, d: int, color: str, ep_sq: Optional[int]) -> bool:
+    enemy = "black" if color == "white" else "white"
+    pos = board.bb
+    if pos.mailbox[s] is None:
+        return False
+
+    # make/unmake sobre la posición: enroque y en passant los resuelve make_move
+    pos.ep_square = ep_sq
+    pos.make_move(encode_move(s, d))
+    try:
+        return not pos.is_square_attacked(pos.king_square(color), enemy)
+    finally:
+        pos.unmake_move()
+
+
+def _ep_sq(ep_target: Optional[Coordenate]) -> Optional[int]:
+    return to_square(ep_target) if ep_target is not None else None
+
+
+# ---------- generación de movimientos ----------
+# Las versiones *_sq trabajan con casillas 0..63 (a1 = 0); las que reciben
+# Coordenate convierten en la entrada y la salida (para la interfaz).
+
+def generate_moves(board: Board, src: Coordenate, turn: str, ep_target):
+    return [from_square(d) for d in generate_moves_sq(board, to_square(src), turn, _ep_sq(ep_target))]
+
+
+def generate_moves_sq(board: Board, s: int, turn: str, ep_sq: Optional[int]) -> List[int]:
+    pos = board.bb
+    code = pos.mailbox[s]
+    if code is None or COLORS[code // 6] != turn:
+        return []
+
+    us, kind = code // 6, code % 6
+    enemy = COLORS[1 - us]
+    occ = pos.occupied
+    free = ~pos.occupancy[us]
+
+    # Caballo
+    if kind == KNIGHT:
+        return list(iter_bits(KNIGHT_ATTACKS[s] & free))
+
+    # Rey + enroque
+    if kind == KING:
+        res = list(iter_bits(KING_ATTACKS[s] & free))
+
+        # Derechos de enroque: los lleva la posición (make_move los actualiza)
+        short, long_ = (CASTLE_WK, CASTLE_WQ) if us == WHITE else (CASTLE_BK, CASTLE_BQ)
+        back = 0 if us == WHITE else 56
+        rook = us * 6 + ROOK
+        if pos.castling & (short | long_) and s == back + 4:
+            # enroque corto
+            if pos.castling & short and pos.mailbox[back + 7] == rook:
+                f, g = back + 5, back + 6
+                if not (occ >> f) & 1 and not (occ >> g) & 1:
+                    if (not pos.is_square_attacked(s, enemy)
+                            and not pos.is_square_attacked(f, enemy)
+                            and not pos.is_square_attacked(g, enemy)):
+                        res.append(g)
+
+            # enroque largo
+            if pos.castling & long_ and pos.mailbox[back] == rook:
+                d, c, b = back + 3, back + 2, back + 1
+                if not (occ >> d) & 1 and not (occ >> c) & 1 and not (occ >> b) & 1:
+                    if (not pos.is_square_attacked(s, enemy)
+                            and not pos.is_square_attacked(d, enemy)
+                            and not pos.is_square_attacked(c, enemy)):
+                        res.append(c)
+
+        return res
+
+    # Deslizantes: una pasada por rayo, hasta el primer bloqueador (incluido si es rival)
+    if kind in SLIDER_DIRS:
+        res = []
+        for d in SLIDER_DIRS[kind]:
+            squares = list(iter_bits(ray_attacks(d, s, occ) & free))
+            if d < 0:
+                squares.reverse()  # de la pieza hacia afuera
+            res += squares
+        return res
+
+    # Peón
+    if kind == PAWN:
+        res = []
+        forward = 8 if us == WHITE else -8
+        start_rank = 1 if us == WHITE else 6
+
+        # avance 1 y avance doble
+        one = s + forward
+        if 0 <= one < 64 and not (occ >> one) & 1:
+            res.append(one)
+            two = one + forward
+            if s >> 3 == start_rank and not (occ >> two) & 1:
+                res.append(two)
+
+        # capturas normales
+        attacks = PAWN_ATTACKS[us][s]
+        res += iter_bits(attacks & pos.occupancy[1 - us])
+
+        # captura al paso
+        if ep_sq is not None and (attacks >> ep_sq) & 1:
+            if pos.mailbox[ep_sq - forward] == (1 - us) * 6 + PAWN:
+                res.append(ep_sq)
+
+        return res
+
+    return []
+
+
+# ---------- mapa de jugadas legales por posición ----------
+# origen -> destinos de todas las piezas del bando que mueve, generado en
+# una sola pasada (board/movegen.py) y guardado por clave Zobrist: se arma
+# una vez por media jugada (lo hace el chequeo de fin de partida) y los
+# clics de selección lo reutilizan. Al aplicar una jugada cambia la clave.
+MOVE_MAP_CACHE_SIZE = 64
+
+_move_maps: "OrderedDict[tuple, Dict[int, List[int]]]" = OrderedDict()
+_move_maps_lock = threading.Lock()   # lo comparten game.py y el hilo de análisis
+
+
+def legal_move_map(board: Board, turn: str, ep_target) -> Dict[int, List[int]]:
+    """Destinos legales de cada pieza de 'turn' (casillas 0..63, promoción a dama)."""
+    pos = board.bb
+    pos.ep_square = _ep_sq(ep_target)
+    key = (pos.key, turn)
+    with _move_maps_lock:
+        cached = _move_maps.get(key)
+        if cached is not None:
+            _move_maps.move_to_end(key)
+            return cached
+
+    moves: Dict[int, List[int]] = {}
+    for mv in generate_legal_moves(pos, turn):
+        s, d = mv & 63, (mv >> 6) & 63
+        targets = moves.setdefault(s, [])
+        if d not in targets:  # las cuatro promociones van al mismo destino
+            targets.append(d)
+
+    with _move_maps_lock:
+        _move_maps[key] = moves
+        if len(_move_maps) > MOVE_MAP_CACHE_SIZE:
+            _move_maps.popitem(last=False)
+    return moves
+
+
+def legal_moves(board: Board, src: Coordenate, turn: str, ep_target):
+    return [from_square(d) for d in legal_moves_sq(board, to_square(src), turn, _ep_sq(ep_target))]
+
+
+def legal_moves_sq(board: Board, s: int, turn: str, ep_sq: Optional[int]) -> List[int]:
+    return [d for d in generate_moves_sq(board, s, turn, ep_sq)
+            if king_safe_after_sq(board, s, d, turn, ep_sq)]
+
+
+# ---------- aplicar movimiento ----------
+def apply_simple_move(board: Board, src: Coordenate, dst: Coordenate, ep_target):
+    ep = apply_move_sq(board, to_square(src), to_square(dst), _ep_sq(ep_target))
+    return None if ep is None else from_square(ep)
+
+
+def apply_move_sq(board: Board, s: int, d: int, ep_sq: Optional[int]) -> Optional[int]:
+    """Aplica s->d (promoción simple a dama). Devuelve la nueva casilla de en passant."""
+    code = board.bb.mailbox[s]
+    if code is None:
+        return None
+
+    # promoción simple a dama
+    promo = QUEEN if code % 6 == PAWN and d >> 3 in (0, 7) else 0
+
+    board.bb.ep_square = ep_sq
+    board.make_move(encode_move(s, d, promo))
+
+    # nueva casilla de en passant (o None)
+    return board.bb.ep_square
+
+
+def sq_to_alg(sq: int) -> str:
+    return f"{FILES[sq & 7]}{(sq >> 3) + 1}"
+
+
+def undo_last_move(board: Board):
+    """Deshace la última jugada (takeback). Devuelve la casilla de en passant restaurada."""
+    board.unmake_move()
+    return board.ep_target()
+
+
+# ---------- chequeo de jaque / mate / ahogado ----------
+def is_in_check(board: Board, color: str) -> bool:
+    kpos = board.king_position(color)
+    enemy = "black" if color == "white" else "white"
+    return board.is_square_attacked(kpos, enemy)
+
+
+def has_any_legal_move(board: Board, color: str, ep_target) -> bool:
+    # Generación completa en una pasada; queda guardada para la selección
+    return bool(legal_move_map(board, color, ep_target))
+
+
+def is_checkmate(board: Board, color: str, ep_target) -> bool:
+    if not is_in_check(board, color):
+        return False
+    if has_any_legal_move(board, color, ep_target):
+        return False
+    return True
+
+
+def is_stalemate(board: Board, color: str, ep_target) -> bool:
+    if is_in_check(board, color):
+        return False
+    if has_any_legal_move(board, color, ep_target):
+        return False
+    return True
+
+
+def game_end_message(board: Board, turn: str, ep_target) -> Optional[str]:
+    """Mensaje de fin de partida para el bando que mueve, o None si sigue."""
+    if is_checkmate(board, turn, ep_target):
+        if turn == "white":
+            return "Negras ganan por jaque mate"
+        return "Blancas ganan por jaque mate"
+    if is_stalemate(board, turn, ep_target):
+        return "Tablas por ahogado"
+    return None
+
+
+# ---------- guardado y carga ----------
+def coord_to_alg(c: Coordenate) -> str:
+    return f"{c.col}{c.row}"
+
+
+def alg_to_coord(sq: str) -> Coordenate:
+    return Coordenate(int(sq[1]), sq[0])
+
+
+def _alg_to_sq(sq: str) -> Optional[int]:
+    if len(sq) != 2 or sq[0] not in "abcdefgh" or sq[1] not in "12345678":
+        return None
+    return to_square(alg_to_coord(sq))
+
+
+def save_game(history: List[str]) -> Optional[str]:
+    """Guarda la partida en GAMES_DIR. Devuelve la ruta del archivo (None si no se guardó)."""
+    if not history:
+        print("[INFO] Nada para guardar.")
+        return None
+    os.makedirs(GAMES_DIR, exist_ok=True)
+    now = datetime.now().strftime("%Y%m%d_%H%M%S")
+    # Nombre nuevo siempre: dos guardados en el mismo segundo llevan sufijo _N
+    n = 0
+    while True:
+        suffix = f"_{n}" if n else ""
+        path = os.path.join(GAMES_DIR, f"game_{now}{suffix}.chess")
+        try:
+            with open(path, "x", encoding="utf-8") as f:
+                for mv in history:
+                    f.write(mv + "\n")
+            print(f"[INFO] Partida guardada en {path}")
+            return path
+        except FileExistsError:
+            n += 1
+        except Exception as e:
+            print(f"[ERROR] No se pudo guardar la partida: {e}")
+            return None
+
+
+def list_saved_games() -> List[str]:
+    if not os.path.isdir(GAMES_DIR):
+        return []
+    files = [
+        os.path.join(GAMES_DIR, f)
+        for f in os.listdir(GAMES_DIR)
+        if f.lower().endswith(".chess")
+    ]
+    files.sort()
+    return files
+
+
+def load_game_from_file(path: str):
+    board = Board()
+    turn = "white"
+    ep = None
+    history: List[str] = []
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            lines = [ln.strip() for ln in f if ln.strip()]
+    except Exception as e:
+        print(f"[ERROR] No se pudo leer {path}: {e}")
+        return board, "white", None, []
+
+    # Cada línea se valida contra las jugadas legales antes de aplicarla:
+    # history, turn y la pila de deshacer de board.bb avanzan juntas
+    # (undo_last_move) y un archivo corrupto se carga hasta la última buena.
+    for n, mv in enumerate(lines, 1):
+        s, d = _alg_to_sq(mv[:2]), _alg_to_sq(mv[2:4])
+        if s is None or d not in legal_move_map(board, turn, ep).get(s, ()):
+            print(f"[ERROR] {path}: jugada {n} ilegal o mal formada ({mv}), se carga hasta la anterior")
+            break
+        ep = apply_simple_move(board, from_square(s), from_square(d), ep)
+        history.append(mv)
+        turn = "black" if turn == "white" else "white"
+
+    print(f"[INFO] Partida cargada desde {path}")
+    return board, turn, ep, history
@@ -0,0 +1,262 @@
+# archive.py
+# ---------------------------------------------------------------------
+# Archivo binario de partidas: muchas partidas en un solo archivo, 16 bits
+# por jugada, para no pagar abrir/cerrar un .chess por partida.
+#
+# Formato (todo little-endian):
+#   cabecera  "CHSA" | versión u16 | reservado u16 | cantidad u32 | reservado u32
+#   índice    cantidad × (offset u64 | medias jugadas u32 | fecha i64 | resultado u8 | 3 bytes)
+#   jugadas   u16 por jugada = origen | destino << 6 | promoción << 12
+#             (la codificación de board/movegen.py)
+#
+# La lectura usa mmap: abrir el archivo no lee las jugadas, cada partida
+# se decodifica al pedirla.
+#
+# Uso (desde la raíz del repo):
+#   python -m storage.archive pack [carpetas_o_archivos ...] --out partidas.chsa
+#   python -m storage.archive unpack partidas.chsa --out carpeta
+#   python -m storage.archive list partidas.chsa
+# ---------------------------------------------------------------------
+
+import argparse
+import mmap
+import os
+import struct
+import sys
+import time
+from array import array
+from datetime import datetime
+from typing import Iterable, Iterator, List, NamedTuple, Optional
+
+from board.bitboard import BitboardPosition, QUEEN
+from board.movegen import find_legal_move, move_from_uci, move_to_uci
+from storage.chessfiles import GAMES_DIR, collect_files, parse_uci, position_result
+
+MAGIC = b"CHSA"
+VERSION = 1
+
+HEADER = struct.Struct("<4sHHII")
+ENTRY = struct.Struct("<QIqB3x")
+
+RESULT_UNKNOWN, RESULT_WHITE, RESULT_BLACK, RESULT_DRAW = range(4)
+RESULT_NAMES = ("*", "1-0", "0-1", "1/2-1/2")
+
+
+class ArchiveError(Exception):
+    """Archivo que no es un archivo de partidas válido."""
+
+
+class GameInfo(NamedTuple):
+    offset: int
+    plies: int
+    date: int       # segundos desde epoch
+    result: int     # RESULT_*
+
+
+class GameRecord(NamedTuple):
+    moves: List[int]
+    date: int
+    result: int
+
+
+# ------------------------------- lectura ------------------------------------
+
+class GameArchive:
+    """Archivo abierto con mmap. Se usa como contexto: with GameArchive(p) as a: ..."""
+
+    def __init__(self, path: str):
+        self.path = path
+        self._file = open(path, "rb")
+        try:
+            self._mm = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:
+            self._file.close()
+            raise ArchiveError(f"{path}: archivo vacío")
+        if len(self._mm) < HEADER.size:
+            self.close()
+            raise ArchiveError(f"{path}: cabecera incompleta")
+        magic, version, _, count, _ = HEADER.unpack_from(self._mm, 0)
+        if magic != MAGIC or version != VERSION:
+            self.close()
+            raise ArchiveError(f"{path}: no es un archivo de partidas (v{VERSION})")
+        self.count = count
+
+    def __len__(self) -> int:
+        return self.count
+
+    def info(self, i: int) -> GameInfo:
+        if not 0 <= i < self.count:
+            raise IndexError(i)
+        return GameInfo(*ENTRY.unpack_from(self._mm, HEADER.size + i * ENTRY.size))
+
+    def moves(self, i: int) -> List[int]:
+        info = self.info(i)
+        moves = array("H")
+        moves.frombytes(self._mm[info.offset:info.offset + 2 * info.plies])
+        if sys.byteorder == "big":
+            moves.byteswap()
+        return moves.tolist()
+
+    def uci_moves(self, i: int) -> List[str]:
+        return [move_to_uci(m) for m in self.moves(i)]
+
+    def __iter__(self) -> Iterator[GameRecord]:
+        for i in range(self.count):
+            info = self.info(i)
+            yield GameRecord(self.moves(i), info.date, info.result)
+
+    def close(self) -> None:
+        if getattr(self, "_mm", None) is not None:
+            self._mm.close()
+            self._mm = None
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+# ------------------------------- escritura ----------------------------------
+
+def write_archive(path: str, games: Iterable[GameRecord]) -> int:
+    """Escribe las partidas en 'path' (reemplazo atómico). Devuelve cuántas."""
+    games = list(games)
+    data_start = HEADER.size + len(games) * ENTRY.size
+    tmp = path + ".tmp"
+    with open(tmp, "wb") as f:
+        f.write(HEADER.pack(MAGIC, VERSION, 0, len(games), 0))
+        offset = data_start
+        for g in games:
+            f.write(ENTRY.pack(offset, len(g.moves), g.date, g.result))
+            offset += 2 * len(g.moves)
+        for g in games:
+            moves = array("H", g.moves)
+            if sys.byteorder == "big":
+                moves.byteswap()
+            f.write(moves.tobytes())
+    os.replace(tmp, path)
+    return len(games)
+
+
+def append_games(path: str, games: Iterable[GameRecord]) -> int:
+    """Agrega partidas al final (reescribe el archivo; el índice va adelante)."""
+    old: List[GameRecord] = []
+    if os.path.exists(path):
+        with GameArchive(path) as arc:
+            old = list(arc)
+    return write_archive(path, old + list(games))
+
+
+# ------------------------------ conversión ----------------------------------
+
+def replay_position(moves: List[int]) -> Optional[BitboardPosition]:
+    """Posición final tras reproducir las jugadas, o None si alguna es ilegal."""
+    pos = BitboardPosition.starting()
+    for mv in moves:
+        legal = find_legal_move(pos, pos.turn, mv & 63, (mv >> 6) & 63, (mv >> 12) or QUEEN)
+        if legal is None:
+            return None
+        pos.make_move(legal)
+    return pos
+
+
+def position_result_code(pos: Optional[BitboardPosition]) -> int:
+    if pos is None:
+        return RESULT_UNKNOWN
+    return RESULT_NAMES.index(position_result(pos).split()[0])
+
+
+def replay_result(moves: List[int]) -> int:
+    """Resultado (RESULT_*) reproduciendo las jugadas; desconocido si alguna es ilegal."""
+    return position_result_code(replay_position(moves))
+
+
+def parse_chess_lines(lines: List[str]) -> List[int]:
+    """Jugadas de un .chess ya leído. ArchiveError si hay una línea mal formada."""
+    moves = []
+    for lineno, line in enumerate(lines, 1):
+        if parse_uci(line) is None:
+            raise ArchiveError(f"línea {lineno} mal formada: {line!r}")
+        moves.append(move_from_uci(line))
+    return moves
+
+
+def read_chess_file(path: str, with_result: bool = True) -> GameRecord:
+    """Lee un .chess (una jugada UCI por línea). ArchiveError si hay una línea mal formada."""
+    with open(path, "r", encoding="utf-8") as f:
+        lines = [ln.strip() for ln in f if ln.strip()]
+    moves = parse_chess_lines(lines)
+    result = replay_result(moves) if with_result else RESULT_UNKNOWN
+    return GameRecord(moves, int(os.path.getmtime(path)), result)
+
+
+def write_chess_file(path: str, moves: List[int]) -> None:
+    # Mismo formato que rules.save_game
+    with open(path, "w", encoding="utf-8") as f:
+        for mv in moves:
+            f.write(move_to_uci(mv) + "\n")
+
+
+def chess_to_archive(files: List[str], out_path: str, with_result: bool = True) -> int:
+    games = []
+    for path in files:
+        try:
+            games.append(read_chess_file(path, with_result))
+        except (OSError, UnicodeDecodeError, ArchiveError) as e:
+            print(f"[WARN] Se omite {path}: {e}")
+    return write_archive(out_path, games)
+
+
+def archive_to_chess(archive_path: str, out_dir: str) -> int:
+    os.makedirs(out_dir, exist_ok=True)
+    with GameArchive(archive_path) as arc:
+        for i, game in enumerate(arc):
+            stamp = datetime.fromtimestamp(game.date).strftime("%Y%m%d_%H%M%S")
+            write_chess_file(os.path.join(out_dir, f"game_{stamp}_{i:06d}.chess"), game.moves)
+        return len(arc)
+
+
+# --------------------------------- CLI -------------------------------------
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Archivo binario de partidas (.chsa)")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    pk = sub.add_parser("pack", help=".chess -> archivo")
+    pk.add_argument("targets", nargs="*", default=[GAMES_DIR])
+    pk.add_argument("--out", required=True)
+    pk.add_argument("--no-result", action="store_true",
+                    help="no reproducir las partidas para calcular el resultado")
+
+    up = sub.add_parser("unpack", help="archivo -> .chess")
+    up.add_argument("archive")
+    up.add_argument("--out", default=GAMES_DIR)
+
+    ls = sub.add_parser("list", help="mostrar el índice")
+    ls.add_argument("archive")
+
+    args = parser.parse_args()
+    t0 = time.perf_counter()
+    try:
+        if args.command == "pack":
+            n = chess_to_archive(collect_files(args.targets), args.out, not args.no_result)
+            print(f"{n} partidas en {args.out} ({time.perf_counter() - t0:.2f}s)")
+        elif args.command == "unpack":
+            n = archive_to_chess(args.archive, args.out)
+            print(f"{n} partidas escritas en {args.out}/ ({time.perf_counter() - t0:.2f}s)")
+        else:
+            with GameArchive(args.archive) as arc:
+                for i in range(len(arc)):
+                    info = arc.info(i)
+                    date = datetime.fromtimestamp(info.date).strftime("%Y-%m-%d %H:%M")
+                    print(f"{i:>6}  {date}  {info.plies:>4} medias jugadas  {RESULT_NAMES[info.result]}")
+    except (OSError, ArchiveError) as e:
+        print(f"[ERROR] {e}")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,59 @@
+# chessfiles.py
+# ---------------------------------------------------------------------
+# Partidas .chess (una jugada UCI por línea): lectura de jugadas,
+# resultado de la posición final y listado de archivos. Lo usan
+# validate_games.py y las herramientas de storage/ y engine/ sin
+# depender de rules.py ni de los scripts de línea de comandos.
+# ---------------------------------------------------------------------
+
+import os
+from typing import List, Optional
+
+from board.bitboard import BitboardPosition, FILES, QUEEN
+from board.movegen import LETTER_PROMO, generate_legal_moves, in_check
+
+# Carpeta donde la interfaz guarda las partidas (relativa al directorio de trabajo)
+GAMES_DIR = "games"
+
+RANKS = "12345678"
+
+
+def parse_uci(line: str) -> Optional[tuple]:
+    """(origen, destino, promoción) de una jugada UCI, o None si está mal formada."""
+    if len(line) not in (4, 5):
+        return None
+    if line[0] not in FILES or line[2] not in FILES or line[1] not in RANKS or line[3] not in RANKS:
+        return None
+    promo = QUEEN
+    if len(line) == 5:
+        if line[4].lower() not in LETTER_PROMO:
+            return None
+        promo = LETTER_PROMO[line[4].lower()]
+    src = (int(line[1]) - 1) * 8 + FILES.index(line[0])
+    dst = (int(line[3]) - 1) * 8 + FILES.index(line[2])
+    return src, dst, promo
+
+
+def position_result(pos: BitboardPosition) -> str:
+    if not generate_legal_moves(pos, pos.turn):
+        if in_check(pos, pos.turn):
+            return "0-1 (jaque mate)" if pos.turn == "white" else "1-0 (jaque mate)"
+        return "1/2-1/2 (ahogado)"
+    if pos.halfmove >= 100:
+        return "1/2-1/2 (50 jugadas)"
+    if pos.is_repetition(2):
+        return "1/2-1/2 (triple repetición)"
+    return "* (en curso)"
+
+
+def collect_files(targets: List[str]) -> List[str]:
+    """Archivos .chess de las carpetas (recursivo) y archivos dados, ordenados."""
+    files = []
+    for t in targets:
+        if os.path.isdir(t):
+            for root, _, names in os.walk(t):
+                files += [os.path.join(root, n) for n in names if n.lower().endswith(".chess")]
+        else:
+            files.append(t)
+    files.sort()
+    return files
@@ -0,0 +1,193 @@
+# index.py
+# ---------------------------------------------------------------------
+# Índice persistente de las partidas guardadas (games/.index), para que
+# el menú de carga no liste ni ordene la carpeta cada vez que se abre.
+#
+# Formato (little-endian), registros de ancho fijo:
+#   cabecera  "CHSI" | versión u16 | reservado u16 | cantidad u32 | mtime de la carpeta i64 (ns)
+#   registro  nombre (96 bytes utf-8) | mtime i64 | medias jugadas u32 |
+#             resultado u8 (storage/archive.py RESULT_*) | 3 bytes | clave Zobrist final u64
+#
+# El registro i está en HEADER + i * RECORD: leer una página cuesta lo
+# que mide la página. Los registros van ordenados por nombre, igual que
+# tras una resincronización; guardar una partida inserta su registro en
+# ese orden (con los nombres game_<fecha>.chess, casi siempre al final).
+# Si la carpeta cambió por fuera (su mtime no coincide con la cabecera)
+# se vuelve a sincronizar con un listado completo.
+# ---------------------------------------------------------------------
+
+import os
+import struct
+from typing import Dict, List, NamedTuple, Optional
+
+from storage.archive import (
+    ArchiveError, RESULT_UNKNOWN, parse_chess_lines, position_result_code, replay_position,
+)
+
+INDEX_NAME = ".index"
+MAGIC = b"CHSI"
+VERSION = 1
+NAME_BYTES = 96
+
+HEADER = struct.Struct("<4sHHIq")
+RECORD = struct.Struct(f"<{NAME_BYTES}sqIB3xQ")
+
+
+class IndexEntry(NamedTuple):
+    name: str       # nombre del archivo dentro de la carpeta
+    mtime: int      # segundos desde epoch
+    plies: int
+    result: int     # RESULT_*
+    key: int        # clave Zobrist de la posición final (0 si no se pudo reproducir)
+
+
+def scan_game(path: str) -> IndexEntry:
+    """Reproduce un .chess para armar su registro (si falla, resultado desconocido)."""
+    name = os.path.basename(path)
+    mtime = int(os.path.getmtime(path))
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            moves = parse_chess_lines([ln.strip() for ln in f if ln.strip()])
+    except (OSError, UnicodeDecodeError, ArchiveError):
+        return IndexEntry(name, mtime, 0, RESULT_UNKNOWN, 0)
+    pos = replay_position(moves)
+    return IndexEntry(name, mtime, len(moves), position_result_code(pos), pos.key if pos else 0)
+
+
+class GameIndex:
+    def __init__(self, directory: str):
+        self.directory = directory
+        self.path = os.path.join(directory, INDEX_NAME)
+        self.count = 0
+
+    def __len__(self) -> int:
+        return self.count
+
+    # ------------------------------ lectura ------------------------------------
+
+    def sync(self) -> None:
+        """Deja el índice al día. Si nadie tocó la carpeta solo lee la cabecera."""
+        if not os.path.isdir(self.directory):
+            self.count = 0
+            return
+        header = self._read_header()
+        if header is not None and header[1] == self._dir_mtime():
+            self.count = header[0]
+            return
+        self._rebuild(self._read_all() if header is not None else [])
+
+    def page(self, start: int, size: int) -> List[IndexEntry]:
+        """Registros [start, start + size) sin leer el resto del índice."""
+        start = max(0, start)
+        size = max(0, min(size, self.count - start))
+        if not size:
+            return []
+        with open(self.path, "rb") as f:
+            f.seek(HEADER.size + start * RECORD.size)
+            data = f.read(size * RECORD.size)
+        return [_unpack(data, i * RECORD.size) for i in range(len(data) // RECORD.size)]
+
+    def file_path(self, entry: IndexEntry) -> str:
+        return os.path.join(self.directory, entry.name)
+
+    # ------------------------------ escritura ----------------------------------
+
+    def add(self, path: str) -> Optional[IndexEntry]:
+        """
+        Agrega una partida recién guardada en la carpeta, insertando su
+        registro en orden por nombre (el mismo que usa _rebuild). El índice
+        tiene que estar sincronizado antes de guardar (sync()): el archivo
+        nuevo ya cambió el mtime de la carpeta y se da por hecho que fue el
+        único cambio. save_game nunca reutiliza un nombre, así que no hace
+        falta buscar un registro anterior.
+        """
+        header = self._read_header()
+        if header is None:
+            self._rebuild([])   # el índice nuevo ya incluye el archivo
+            return None
+        self.count = header[0]
+        entry = scan_game(path)
+        if len(entry.name.encode("utf-8")) > NAME_BYTES:
+            print(f"[WARN] Nombre demasiado largo para el índice: {entry.name}")
+            return None
+        with open(self.path, "r+b") as f:
+            # búsqueda binaria del lugar; solo se corren los registros posteriores
+            lo, hi = 0, self.count
+            while lo < hi:
+                mid = (lo + hi) // 2
+                if _name_at(f, mid) < entry.name:
+                    lo = mid + 1
+                else:
+                    hi = mid
+            f.seek(HEADER.size + lo * RECORD.size)
+            tail = f.read()
+            f.seek(HEADER.size + lo * RECORD.size)
+            f.write(_pack(entry) + tail)
+            self.count += 1
+            self._write_header(f)
+        return entry
+
+    def _rebuild(self, known: List[IndexEntry]) -> None:
+        # Reutiliza los registros de archivos que no cambiaron y escanea el resto
+        by_name: Dict[str, IndexEntry] = {e.name: e for e in known}
+        entries = []
+        for name in sorted(os.listdir(self.directory)):
+            if not name.lower().endswith(".chess"):
+                continue
+            if len(name.encode("utf-8")) > NAME_BYTES:
+                print(f"[WARN] Nombre demasiado largo para el índice: {name}")
+                continue
+            path = os.path.join(self.directory, name)
+            old = by_name.get(name)
+            entries.append(old if old and old.mtime == int(os.path.getmtime(path)) else scan_game(path))
+
+        tmp = self.path + ".tmp"
+        with open(tmp, "wb") as f:
+            f.write(HEADER.pack(MAGIC, VERSION, 0, 0, 0))
+            f.writelines(_pack(e) for e in entries)
+        os.replace(tmp, self.path)
+        # la cabecera se escribe después del replace: así guarda el mtime final de la carpeta
+        self.count = len(entries)
+        with open(self.path, "r+b") as f:
+            self._write_header(f)
+
+    # ------------------------------ internos ----------------------------------
+
+    def _dir_mtime(self) -> int:
+        return os.stat(self.directory).st_mtime_ns
+
+    def _read_header(self):
+        try:
+            with open(self.path, "rb") as f:
+                data = f.read(HEADER.size)
+        except OSError:
+            return None
+        if len(data) < HEADER.size:
+            return None
+        magic, version, _, count, dir_mtime = HEADER.unpack(data)
+        if magic != MAGIC or version != VERSION:
+            return None
+        return count, dir_mtime
+
+    def _read_all(self) -> List[IndexEntry]:
+        header = self._read_header()
+        self.count = header[0] if header else 0
+        return self.page(0, self.count)
+
+    def _write_header(self, f) -> None:
+        f.seek(0)
+        f.write(HEADER.pack(MAGIC, VERSION, 0, self.count, self._dir_mtime()))
+
+
+def _pack(e: IndexEntry) -> bytes:
+    return RECORD.pack(e.name.encode("utf-8"), e.mtime, e.plies, e.result, e.key)
+
+
+def _name_at(f, i: int) -> str:
+    f.seek(HEADER.size + i * RECORD.size)
+    return f.read(NAME_BYTES).rstrip(b"\0").decode("utf-8")
+
+
+def _unpack(data: bytes, offset: int) -> IndexEntry:
+    name, mtime, plies, result, key = RECORD.unpack_from(data, offset)
+    return IndexEntry(name.rstrip(b"\0").decode("utf-8"), mtime, plies, result, key)
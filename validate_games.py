@@ -0,0 +1,97 @@
+# validate_games.py
+# ---------------------------------------------------------------------
+# Valida en lote las partidas guardadas (.chess, una jugada UCI por
+# línea). Cada archivo se reproduce con el generador de jugadas legales
+# (board/movegen.py) y se informa:
+#   - ok + resultado (mate, ahogado, 50 jugadas, repetición o en curso)
+#   - ilegal en la media jugada N
+#   - línea mal formada N
+# Los archivos se reparten entre procesos (ProcessPoolExecutor), uno por
+# núcleo por defecto.
+#
+# Uso (desde la raíz del repo):
+#   python validate_games.py [carpeta_o_archivos ...] [--jobs N] [--errors]
+# Sale con código 1 si algún archivo no es válido.
+# ---------------------------------------------------------------------
+
+import argparse
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import List, NamedTuple, Optional
+
+from board.bitboard import BitboardPosition
+from board.movegen import find_legal_move
+from storage.chessfiles import GAMES_DIR, collect_files, parse_uci, position_result
+
+# Archivos por tarea enviada a cada proceso (menos ida y vuelta entre procesos)
+CHUNK_SIZE = 16
+
+
+class Report(NamedTuple):
+    path: str
+    ok: bool
+    plies: int
+    detail: str
+
+
+def validate_file(path: str) -> Report:
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            lines = [ln.strip() for ln in f]
+    except (OSError, UnicodeDecodeError) as e:
+        return Report(path, False, 0, f"no se pudo leer: {e}")
+
+    pos = BitboardPosition.starting()
+    plies = 0
+    for lineno, line in enumerate(lines, 1):
+        if not line:
+            continue
+        parsed = parse_uci(line)
+        if parsed is None:
+            return Report(path, False, plies, f"línea {lineno} mal formada: {line!r}")
+        move = find_legal_move(pos, pos.turn, *parsed)
+        if move is None:
+            return Report(path, False, plies, f"jugada ilegal en la media jugada {plies + 1}: {line}")
+        pos.make_move(move)
+        plies += 1
+    return Report(path, True, plies, position_result(pos))
+
+
+def validate_all(files: List[str], jobs: Optional[int] = None) -> List[Report]:
+    if jobs == 1 or len(files) < 2:
+        return [validate_file(p) for p in files]
+    with ProcessPoolExecutor(max_workers=jobs) as pool:
+        return list(pool.map(validate_file, files, chunksize=CHUNK_SIZE))
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Valida partidas .chess en paralelo")
+    parser.add_argument("targets", nargs="*", default=[GAMES_DIR],
+                        help=f"carpetas o archivos (por defecto {GAMES_DIR}/)")
+    parser.add_argument("--jobs", type=int, default=None,
+                        help="procesos (por defecto, uno por núcleo)")
+    parser.add_argument("--errors", action="store_true", help="mostrar solo los archivos con error")
+    args = parser.parse_args()
+
+    files = collect_files(args.targets)
+    if not files:
+        print("[INFO] No hay partidas para validar.")
+        return 0
+
+    t0 = time.perf_counter()
+    reports = validate_all(files, args.jobs)
+    dt = time.perf_counter() - t0
+
+    bad = 0
+    for r in reports:
+        bad += not r.ok
+        if r.ok and args.errors:
+            continue
+        print(f"{r.path}: {'ok' if r.ok else 'ERROR'} - {r.plies} medias jugadas - {r.detail}")
+    print(f"{len(reports)} archivos ({len(reports) - bad} ok, {bad} con error) en {dt:.2f}s")
+    return 1 if bad else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())